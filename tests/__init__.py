@@ -1,4 +1,12 @@
 from . import test_ed25519
+from . import test_ed25519_numpy
+from . import test_cache
+from . import test_scalar
+from . import test_crypto
+from . import test_provider
+from . import test_scanner
+from . import test_index
+from . import test_lookahead
 from . import test_address
 from . import test_numbers
 from . import test_seed
@@ -6,3 +14,4 @@ from . import test_transaction
 from . import test_wallet
 from . import test_offline
 from . import test_jsonrpcwallet
+from . import test_jsonrpcdaemon
@@ -1,8 +1,10 @@
+from binascii import unhexlify
 import json
 import os
 import unittest
 
 from uplexa.address import Address, SubAddress, IntegratedAddress, address
+from uplexa.address import cache_clear, cache_info
 from tests.utils import classproperty
 
 
@@ -80,6 +82,64 @@ class Tests(object):
 
         self.assertNotEqual(a, 0)
 
+    def test_from_keys(self):
+        net = 'mainnet' if self.mainnet else 'testnet' if self.testnet else 'stagenet'
+        a = Address.from_keys(net, unhexlify(self.psk), unhexlify(self.pvk))
+        self.assertIsNone(a._encoded)
+        self.assertEqual(a.spend_key(), self.psk)
+        self.assertEqual(a, Address(self.addr))
+        self.assertEqual(str(a), self.addr)
+        self.assertEqual(Address.from_keys(net, self.psk, self.pvk, label='x').label, 'x')
+        ia = IntegratedAddress.from_keys(net, self.psk, self.pvk, self.pid)
+        self.assertIsInstance(ia, IntegratedAddress)
+        self.assertEqual(str(ia), self.iaddr)
+        self.assertEqual(ia.payment_id(), self.pid)
+        sa = SubAddress(self.subaddr)
+        sa2 = SubAddress.from_keys(net, sa.spend_key(), sa.view_key())
+        self.assertEqual(sa2, sa)
+        self.assertEqual(getattr(sa2, 'is_' + net)(), True)
+        self.assertRaises(ValueError, Address.from_keys, 'livenet', self.psk, self.pvk)
+        self.assertRaises(ValueError, Address.from_keys, net, self.psk[:62], self.pvk)
+        self.assertRaises(ValueError, SubAddress.from_keys, net, self.psk, b'\0' * 33)
+
+    def test_hash_and_slots(self):
+        a, ia, sa = Address(self.addr), IntegratedAddress(self.iaddr), SubAddress(self.subaddr)
+        for addr in (a, ia, sa):
+            self.assertFalse(hasattr(addr, '__dict__'))
+            self.assertIsInstance(addr._decoded, bytes)
+        self.assertEqual(hash(a), hash(address(self.addr)))
+        self.assertEqual(hash(a), hash(ia.base_address()))
+        self.assertIn(ia.base_address(), set([sa, a]))
+        self.assertNotIn(a, set([sa, ia]))
+        self.assertFalse(a != Address(self.addr))
+        self.assertTrue(a != sa)
+        self.assertTrue(a != self.subaddr)
+        self.assertNotEqual(a, 1)
+        self.assertRaises(AttributeError, setattr, a, 'foo', 1)
+        for addr in (a, ia, sa):
+            self.assertEqual(hash(addr), hash(str(addr)))
+            self.assertIn(str(addr), set([addr]))
+            self.assertIn(addr, set([str(addr)]))
+            self.assertEqual({str(addr): 1}[addr], 1)
+        self.assertNotIn(self.subaddr, set([a]))
+
+    def test_factory_cache(self):
+        cache_clear()
+        a = address(self.addr, label='a')
+        b = address(self.addr)
+        self.assertIsNot(a, b)
+        self.assertEqual(a, b)
+        self.assertEqual((a.label, b.label), ('a', None))
+        self.assertIsInstance(address(self.subaddr), SubAddress)
+        self.assertIsInstance(address(self.iaddr), IntegratedAddress)
+        self.assertIsInstance(address(self.iaddr), IntegratedAddress)
+        info = cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (2, 3, 3))
+        bad = self.addr[:-1] + ('1' if self.addr[-1] != '1' else '2')
+        self.assertRaises(ValueError, address, bad)
+        self.assertRaises(ValueError, address, bad)
+        self.assertEqual(cache_info()['size'], 3)
+
     def test_check_private_view_key(self):
         a = Address(self.addr)
         self.assertFalse(a.check_private_view_key(self.ssk))
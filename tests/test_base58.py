@@ -1,6 +1,8 @@
+from binascii import hexlify
 import unittest
 
-from uplexa.base58 import decode, encode
+from uplexa import base58
+from uplexa.base58 import decode, decode_bytes, encode, encode_bytes
 
 
 class Base58EncodeTestCase(unittest.TestCase):
@@ -21,3 +23,66 @@ class Base58DecodeTestCase(unittest.TestCase):
         with self.assertRaises(ValueError) as cm:
             decode('f')
         self.assertEqual(str(cm.exception), 'Invalid encoded length: 1')
+
+
+class Base58BytesTestCase(unittest.TestCase):
+    addr = '47ewoP19TN7JEEnFKUJHAYhGxkeTRH82sf36giEp9AcNfDBfkAtRLX7A6rZz18bbNHPNV7ex6WYbMN3aKisFRJZ8Ebsmgef'
+
+    def test_roundtrip(self):
+        data = decode_bytes(self.addr)
+        self.assertEqual(hexlify(data).decode(), decode(self.addr))
+        self.assertEqual(decode_bytes(self.addr.encode()), data)
+        self.assertEqual(encode_bytes(data), self.addr)
+        self.assertEqual(encode_bytes(bytearray(data)), self.addr)
+        for n in range(20):
+            data = bytes(bytearray(range(256 - n, 256))) + b'\0' * n
+            self.assertEqual(decode_bytes(encode_bytes(data)), data)
+            self.assertEqual(encode_bytes(data), encode(hexlify(data).decode()))
+        self.assertEqual(encode_bytes(b''), '')
+        self.assertEqual(decode_bytes(''), b'')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError) as cm:
+            decode_bytes('1111')
+        self.assertEqual(str(cm.exception), 'Invalid encoded length: 4')
+        with self.assertRaises(ValueError) as cm:
+            decode_bytes('1l')
+        self.assertEqual(str(cm.exception), 'Invalid symbol: l')
+        self.assertRaises(ValueError, decode_bytes, 'zz')
+        self.assertRaises(ValueError, decode_bytes, 'zzzzzzzzzzz')
+        self.assertRaises(ValueError, decode_bytes, u'\u017a1')
+
+
+class Base58BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.items = [bytes(bytearray((i * 7 + j) % 256 for j in range(69))) for i in range(40)]
+        self.items += [b'\xff' * 69, b'\0' * 69]
+
+    def _check(self):
+        for size in (69, 77, 8, 3):
+            items = [(i * 3)[:size] for i in self.items]
+            enc = base58.batch_encode_bytes(b''.join(items), size)
+            self.assertEqual(enc, [encode_bytes(i) for i in items])
+            self.assertEqual(base58.batch_decode_bytes(enc), b''.join(items))
+        self.assertEqual(base58.batch_encode_bytes(b'', 69), [])
+        self.assertEqual(base58.batch_decode_bytes([]), b'')
+        self.assertRaises(ValueError, base58.batch_encode_bytes, b'\0' * 70, 69)
+        enc = base58.batch_encode_bytes(b''.join(self.items), 69)
+        self.assertRaises(ValueError, base58.batch_decode_bytes, enc + [enc[0][:-1]])
+        for bad in ('l', 'z'):
+            with self.assertRaises(ValueError) as cm:
+                base58.batch_decode_bytes(enc[:20] + [bad * 11 + enc[0][11:]] + enc[20:])
+            with self.assertRaises(ValueError) as cm2:
+                decode_bytes(bad * 11 + enc[0][11:])
+            self.assertEqual(str(cm.exception), str(cm2.exception))
+
+    def test_batch(self):
+        self._check()
+
+    def test_batch_fallback(self):
+        np = base58.np
+        try:
+            base58.np = None
+            self._check()
+        finally:
+            base58.np = np
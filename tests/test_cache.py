@@ -0,0 +1,28 @@
+import unittest
+
+from uplexa.cache import LRUCache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_eviction(self):
+        c = LRUCache(maxsize=2)
+        c.put('a', 1)
+        c.put('b', 2)
+        self.assertEqual(c.get('a'), 1)
+        c.put('c', 3)
+        self.assertIn('a', c)
+        self.assertNotIn('b', c)
+        self.assertIn('c', c)
+        self.assertEqual(len(c), 2)
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(c.get('b', 0), 0)
+
+    def test_info(self):
+        c = LRUCache(maxsize=10)
+        c.put('a', 1)
+        c.get('a')
+        c.get('a')
+        c.get('x')
+        self.assertEqual(c.info(), {'hits': 2, 'misses': 1, 'size': 1, 'maxsize': 10})
+        c.clear()
+        self.assertEqual(c.info(), {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 10})
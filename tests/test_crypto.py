@@ -0,0 +1,140 @@
+from binascii import hexlify, unhexlify
+import json
+import os
+import unittest
+
+from uplexa import base58
+from uplexa import crypto
+from uplexa import ed25519
+
+
+class KeyDerivationTestCase(unittest.TestCase):
+    svk = unhexlify('4d49daffc737e51e33b877e5a0dcc2cc1cb3d4c473713cb905559dfe2722a806')
+    ssk = unhexlify('5b307f80eb4ebd259dfe50b99bb03329ccc953a806a7ffb6401a9294845ccf06')
+    psk = unhexlify('760205fc3bd303c4523b68982d55a247d10affdcf7407f8eaab217d5eb89b536')
+    txkey = unhexlify('8c178fca693abee59d6e7133ee1601c774b0b1bdd89b27e05024331cc3583d8e')
+    derivation = unhexlify('d3f228228f26bd7032288b0dec563a60daa890affb77fcb637831f0be99cad79')
+    index = 300
+    hs = unhexlify('9222d022572365938cb861329b1aea6a7050ecafdf8e0248175b7a06d8555504')
+    out_key = unhexlify('06a3d776e2819ad7187372c8e158ebf8a70877f903a18d222b604338436d5dd0')
+    out_sec = unhexlify('ed524fa3427222b929b7b2eb36cb1d943c1a4058e63502ff57750c9b5cb2240b')
+
+    def test_varint(self):
+        self.assertEqual(crypto.encode_varint(0), b'\x00')
+        self.assertEqual(crypto.encode_varint(127), b'\x7f')
+        self.assertEqual(crypto.encode_varint(300), b'\xac\x02')
+        self.assertEqual(crypto.encode_varint(2**32), b'\x80\x80\x80\x80\x10')
+
+    def test_derivation(self):
+        self.assertEqual(
+            crypto.generate_key_derivation(self.txkey, self.svk), self.derivation)
+        self.assertEqual(
+            crypto.derivation_to_scalar(self.derivation, self.index), self.hs)
+        self.assertRaises(
+            ValueError, crypto.generate_key_derivation, b'\x07' + b'\x00' * 31, self.svk)
+
+    def test_derive_keys(self):
+        self.assertEqual(
+            crypto.derive_public_key(self.derivation, self.index, self.psk), self.out_key)
+        self.assertEqual(
+            crypto.derive_secret_key(self.derivation, self.index, self.ssk), self.out_sec)
+        self.assertEqual(
+            crypto.derive_subaddress_public_key(self.out_key, self.derivation, self.index),
+            self.psk)
+        self.assertNotEqual(
+            crypto.derive_subaddress_public_key(self.out_key, self.derivation, self.index + 1),
+            self.psk)
+
+    def test_key_image(self):
+        self.assertEqual(
+            crypto.generate_key_image(self.out_key, self.out_sec),
+            unhexlify('34229b30e9339427948191e467b3ccd28252d4b70db3a13a2865002a7e84f386'))
+
+    def test_subaddress_secret_key(self):
+        self.assertEqual(
+            crypto.get_subaddress_secret_key(self.svk, 0, 1),
+            unhexlify('7ace805b6330cbbd35dd2099cd302cd7be4894ac66c63a7f0d74b2e22fdd970b'))
+        # m * G + master public spend key gives the subaddress public spend key
+        svk = unhexlify('6d9056aa2c096bfcd2f272759555e5764ba204dd362604a983fa3e0aafd35901')
+        subaddresses = json.load(open(os.path.join(
+                os.path.dirname(__file__), 'data', 'mainnet-subaddrs.json')))
+        master_psk = unhexlify(base58.decode(subaddresses[0][0]))[1:33]
+        for major, minor in ((0, 1), (1, 0), (1, 7)):
+            m = crypto.get_subaddress_secret_key(svk, major, minor)
+            self.assertEqual(
+                ed25519.encodepoint_ext(ed25519.add(
+                    ed25519.decodepoint_ext(master_psk),
+                    ed25519.scalarmult_base(ed25519.decodeint(m)))),
+                unhexlify(base58.decode(subaddresses[major][minor]))[1:33])
+
+
+class MoneroVectorsTestCase(unittest.TestCase):
+    # from tests/crypto/tests.txt of the reference implementation
+    def test_generate_key_derivation(self):
+        self.assertEqual(
+            crypto.generate_key_derivation(
+                unhexlify('7739c95d3298e2f87362dba9e0e0b3980a692ae8e2f16796b0e382098cd6bd83'),
+                unhexlify('3482fb9735ef879fcae5ec7721b5d3646e155c4fb58d6cc11c732c9c9b76620a')),
+            unhexlify('fa188a45a0e4daccc0e6d4f6f6858fd46392104be74183ec0047e7e9f4eaf739'))
+
+    def test_derivation_to_scalar(self):
+        self.assertEqual(
+            crypto.derivation_to_scalar(
+                unhexlify('e720a09f2e3a0bbf4e4ba7ad93653bb296885510121f806acb2a5f9168fafa01'), 0),
+            unhexlify('25d08763414c379aa9cf989cdcb3cadd36bd5193b500107d6bf5f921f18e470e'))
+
+    def test_hash_to_ec(self):
+        self.assertEqual(
+            crypto.hash_to_ec(
+                unhexlify('42f6835bf83114a1f5f6076fe79bdfa0bd67c74b88f127d54572d3910dd09201')),
+            unhexlify('54863a0464c008acc99cffb179bc6cf34eb1bbdf6c29f7a070a7c6376ae30ab5'))
+
+
+class SignatureTestCase(unittest.TestCase):
+    ssk = unhexlify('5b307f80eb4ebd259dfe50b99bb03329ccc953a806a7ffb6401a9294845ccf06')
+    psk = unhexlify('760205fc3bd303c4523b68982d55a247d10affdcf7407f8eaab217d5eb89b536')
+    message = 'This is sample data to be signed'
+    signature = 'SigV1GJa7ceyB9QqMXKP2fZDocwXYPv64M78zgHJahHFdRegyiaviZFJs4yzhRMGJBt7G1JHmwiGQ6HXjLbdBvCpPHB1U'
+
+    def test_signature(self):
+        h = crypto.cn_fast_hash(b'data')
+        sig = crypto.generate_signature(h, self.psk, self.ssk)
+        self.assertEqual(len(sig), 64)
+        self.assertTrue(crypto.check_signature(h, self.psk, sig))
+        self.assertFalse(crypto.check_signature(crypto.cn_fast_hash(b'date'), self.psk, sig))
+        self.assertFalse(crypto.check_signature(h, self.psk, sig[:32] + sig[:32]))
+        self.assertFalse(crypto.check_signature(h, self.psk, sig[:63]))
+        # non-reduced r
+        r = ed25519.encodeint(ed25519.decodeint(sig[32:]) + ed25519.l)
+        self.assertFalse(crypto.check_signature(h, self.psk, sig[:32] + r))
+        self.assertFalse(crypto.check_signature(h, b'\x07' + b'\x00' * 31, sig))
+
+    def test_message_signature(self):
+        self.assertTrue(
+            crypto.check_message_signature(self.message, self.psk, self.signature))
+        self.assertTrue(crypto.check_message_signature(
+            self.message.encode(), self.psk, self.signature))
+        self.assertFalse(
+            crypto.check_message_signature(self.message + '.', self.psk, self.signature))
+        self.assertFalse(crypto.check_message_signature(
+            self.message, self.psk, 'SigV2' + self.signature[5:]))
+        self.assertFalse(crypto.check_message_signature(
+            self.message, self.psk, self.signature[:-1]))
+        sig = crypto.generate_message_signature(u'\u017ale', self.psk, self.ssk)
+        self.assertTrue(sig.startswith('SigV1'))
+        self.assertTrue(crypto.check_message_signature(u'\u017ale', self.psk, sig))
+
+    def test_batch_check(self):
+        messages = ['message {0}'.format(i) for i in range(20)]
+        sigs = [crypto.generate_message_signature(m, self.psk, self.ssk) for m in messages]
+        pubs = [self.psk] * len(messages)
+        self.assertEqual(
+            crypto.batch_check_message_signature(messages, pubs, sigs), [True] * 20)
+        sigs[3], sigs[4] = sigs[4], sigs[3]
+        pubs[7] = ed25519.public_from_secret(self.ssk[::-1])
+        sigs[11] = 'garbage'
+        self.assertEqual(
+            [i for i, ok in enumerate(
+                crypto.batch_check_message_signature(messages, pubs, sigs)) if not ok],
+            [3, 4, 7, 11])
+        self.assertEqual(crypto.batch_check_signature([], [], []), [])
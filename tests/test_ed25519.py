@@ -6,3 +6,184 @@ class Ed25519TestCase(unittest.TestCase):
         pts = [(0,0), (1,1), (3,5), (5,3), (7,11), (11,7)]
         for p in pts:
             self.assertEqual(p, ed25519.compress(ed25519.decompress(p)))
+
+    def test_scalarmult_ext(self):
+        def ladder(P, e):
+            # the textbook affine double-and-add, as a reference
+            if e == 0: return [0, 1]
+            Q = ladder(P, e//2)
+            Q = ed25519.edwards(Q, Q)
+            if e & 1: Q = ed25519.edwards(Q, P)
+            return Q
+        for e in (0, 1, 2, 3, 255, 2**64 + 7, ed25519.l - 1, ed25519.l, 2**256 - 1):
+            self.assertEqual(ed25519.scalarmult(ed25519.B, e), ladder(ed25519.B, e))
+            self.assertEqual(
+                ed25519.compress(ed25519.scalarmult_ext(ed25519.decompress(ed25519.B), e)),
+                tuple(ladder(ed25519.B, e)))
+
+    def test_double(self):
+        P = ed25519.decompress(ed25519.B)
+        self.assertEqual(
+            ed25519.compress(ed25519.double(P)),
+            ed25519.compress(ed25519.add(P, P)))
+
+    def test_public_from_secret(self):
+        self.assertEqual(
+            ed25519.public_from_secret_hex(
+                '482700617ba810f94035d7f4d7ccc1a29878e165b4867872b705204c85406906'),
+            '4ee576f52b9c6a824a3d5c2832d117177d2bb9992507c2c78788bb8dbaf4b640')
+        self.assertEqual(
+            ed25519.public_from_secret_hex(
+                '09ed72c713d3e9e19bef2f5204cf85f6cb25de7842aa0722abeb12697f171903'),
+            'e1ef99d66312ec0b16b17c66c591ab59594e21621588b63b62fa69fe615a768e')
+
+    def test_fixed_base(self):
+        P = ed25519.scalarmult_ext(ed25519.decompress(ed25519.B), 12345)
+        fb = ed25519.register_fixed_base(ed25519.encodepoint_ext(P))
+        self.assertIs(fb, ed25519.register_fixed_base(ed25519.encodepoint_ext(P)))
+        for e in (0, 1, 15, 16, 2**252 + 1, ed25519.l - 1, 2**256 - 1, 2**300 + 5):
+            self.assertEqual(
+                ed25519.compress(fb.mult(e)),
+                ed25519.compress(ed25519.scalarmult_ext(P, e)))
+            self.assertEqual(
+                ed25519.compress(ed25519.scalarmult_base(e)),
+                tuple(ed25519.scalarmult(ed25519.B, e)))
+
+    def test_fixed_base_registry_bounded(self):
+        for i in range(1, ed25519._fixed_bases.maxsize + 10):
+            ed25519.register_fixed_base(ed25519.encodepoint_ext(ed25519.scalarmult_base(i)))
+        self.assertEqual(ed25519._fixed_bases.info()['size'], ed25519._fixed_bases.maxsize)
+
+    def test_multiscalarmult(self):
+        G = ed25519.decompress(ed25519.B)
+        pts = [ed25519.scalarmult_base(7 * i + 3) for i in range(12)]
+        scalars = [(ed25519.l - 1) // (i + 2) + i for i in range(12)]
+        scalars[3] = 0
+        expected = ed25519.ident
+        for s, P in zip(scalars, pts):
+            expected = ed25519.add(expected, ed25519.scalarmult_ext(P, s))
+        expected = ed25519.compress(expected)
+        pairs = list(zip(scalars, pts))
+        self.assertEqual(ed25519.compress(ed25519.multiscalarmult(pairs)), expected)
+        self.assertEqual(ed25519.compress(ed25519._straus(pairs)), expected)
+        self.assertEqual(ed25519.compress(ed25519._pippenger(pairs)), expected)
+        self.assertEqual(ed25519.multiscalarmult([]), ed25519.ident)
+        self.assertEqual(ed25519.multiscalarmult([(0, G)]), ed25519.ident)
+        # above the threshold Pippenger's method is used
+        pairs = [(i + 1, G) for i in range(ed25519._PIPPENGER_THRESHOLD)]
+        n = ed25519._PIPPENGER_THRESHOLD
+        self.assertEqual(
+            ed25519.compress(ed25519.multiscalarmult(pairs)),
+            ed25519.compress(ed25519.scalarmult_base(n * (n + 1) // 2)))
+
+    def test_batch_encodepoint(self):
+        pts = [ed25519.scalarmult_base(3**i) for i in range(20)]
+        self.assertEqual(
+            ed25519.batch_compress(pts),
+            [ed25519.compress(P) for P in pts])
+        self.assertEqual(
+            ed25519.batch_encodepoint(pts),
+            [ed25519.encodepoint_ext(P) for P in pts])
+        self.assertEqual(ed25519.batch_encodepoint([]), [])
+
+    def test_encodepoint(self):
+        self.assertEqual(ed25519.encodepoint([0, 1]), b'\x01' + b'\x00' * 31)
+        self.assertEqual(ed25519.encodepoint([1, 1]), b'\x01' + b'\x00' * 30 + b'\x80')
+        self.assertEqual(
+            ed25519.encodepoint(ed25519.B),
+            b'\x58' + b'\x66' * 31)
+
+    def test_decodepoint(self):
+        def reference(s):
+            # the original bit-by-bit decoder
+            y = sum(2**i * ed25519.bit(s, i) for i in range(0, ed25519.b-1))
+            x = ed25519.xrecover(y)
+            if x & 1 != ed25519.bit(s, ed25519.b-1): x = ed25519.q - x
+            if not ed25519.isoncurve([x, y]): raise Exception("not on curve")
+            return [x, y]
+        for i in range(1, 30):
+            s = ed25519.encodepoint_ext(ed25519.scalarmult_base(7**i))
+            self.assertEqual(ed25519.decodepoint(s), reference(s))
+            self.assertEqual(ed25519.decodepoint(bytearray(s)), reference(s))
+            self.assertEqual(ed25519.encodepoint(ed25519.decodepoint(s)), s)
+            P = ed25519.decodepoint_ext(s)
+            self.assertEqual(P, ed25519.decompress(P[:2]))
+        self.assertEqual(ed25519.decodepoint(b'\x01' + b'\x00' * 31), [0, 1])
+        # non-canonical encoding, y = 18 + q
+        self.assertEqual(ed25519.decodepoint(b'\xff' * 32), reference(b'\xff' * 32))
+        for s in (b'\x02' + b'\x00' * 31, b'\x07' + b'\x00' * 31):
+            self.assertRaises(Exception, reference, s)
+            self.assertRaises(Exception, ed25519.decodepoint, s)
+
+    def test_decodepoint_cache(self):
+        s = ed25519.encodepoint_ext(ed25519.scalarmult_base(2**200 + 11))
+        ed25519._decoded_points.clear()
+        ed25519.decodepoint(s)
+        ed25519.decodepoint(s)
+        info = ed25519._decoded_points.info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (1, 1, 1))
+        pt = ed25519.decodepoint(s)
+        pt[0] = 0
+        self.assertNotEqual(ed25519.decodepoint(s)[0], 0)
+
+    def test_wnaf(self):
+        for e in (0, 1, 2, 31, 32, 2**64 - 1, ed25519.l - 1, 2**256 - 1):
+            for w in (2, 4, 5, 6):
+                naf = ed25519.wnaf(e, w)
+                self.assertEqual(sum(dg << i for i, dg in enumerate(naf)), e)
+                for i, dg in enumerate(naf):
+                    if dg:
+                        self.assertEqual(dg % 2, 1)
+                        self.assertLess(abs(dg), 2**(w-1))
+                        self.assertFalse(any(naf[i+1:i+w]))
+                G = ed25519.decompress(ed25519.B)
+                self.assertEqual(
+                    ed25519.compress(ed25519.scalarmult_wnaf(G, naf)),
+                    ed25519.compress(ed25519.scalarmult_base(e)))
+
+    def test_encode_decode_int(self):
+        for n in (0, 1, 255, 256, ed25519.l, 2**256 - 1):
+            s = ed25519.encodeint(n)
+            self.assertEqual(len(s), 32)
+            self.assertEqual(ed25519.decodeint(s), n)
+        self.assertEqual(ed25519.encodeint(2**256 + 5), ed25519.encodeint(5))
+        self.assertEqual(ed25519.decodeint(b'\x01' + b'\x00' * 31 + b'\x02' * 32), 1)
+
+    def test_ge_fromfe(self):
+        for i in range(64):
+            s = ed25519.encodeint(i * 0x1234567890abcdef ** 4)
+            P = ed25519.compress(ed25519.ge_fromfe_frombytes_vartime(s))
+            self.assertTrue(ed25519.isoncurve(P))
+
+    def test_point_noncanonical(self):
+        # y = q + 1 encodes the neutral element, like y = 1
+        canonical = ed25519.Point.from_bytes(ed25519.encodeint(1))
+        P = ed25519.Point.from_bytes(ed25519.encodeint(ed25519.q + 1))
+        self.assertEqual(P, canonical)
+        self.assertEqual(hash(P), hash(canonical))
+        self.assertEqual(P.to_bytes(), ed25519.encodeint(1))
+        self.assertEqual(len(set([P, canonical])), 1)
+        G = ed25519.Point.base()
+        self.assertEqual(P + G, G)
+
+    def test_point(self):
+        G = ed25519.Point.base()
+        P = G * 7
+        self.assertEqual(P.to_bytes(), ed25519.public_from_secret(ed25519.encodeint(7)))
+        self.assertEqual(P, 7 * G)
+        self.assertEqual(P + G, G * 8)
+        self.assertEqual(P - G, G * 6)
+        self.assertEqual(-P, G * -7)
+        self.assertEqual(G - G, G * 0)
+        self.assertEqual((G - G).to_bytes(), b'\x01' + b'\x00' * 31)
+        self.assertNotEqual(P, G)
+        self.assertEqual(G * ed25519.l, G * 0)
+        Q = ed25519.Point.from_bytes(P.to_bytes()) * 3
+        self.assertEqual(Q, G * 21)
+        self.assertEqual(Q.to_bytes(), (G * 21).to_bytes())
+        self.assertIs(Q.to_bytes(), Q.to_bytes())
+        self.assertEqual(len(set([P, G * 7, G + G * 6, G])), 2)
+        self.assertEqual(P.affine(), tuple(ed25519.scalarmult(ed25519.B, 7)))
+        self.assertRaises(TypeError, lambda: P * 1.5)
+        self.assertRaises(AttributeError, setattr, P, 'foo', 1)
+        self.assertRaises(Exception, ed25519.Point.from_bytes, b'\x02' + b'\x00' * 31)
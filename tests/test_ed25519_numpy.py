@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from uplexa import ed25519
+try:
+    from uplexa import ed25519_numpy
+except ImportError:
+    ed25519_numpy = None
+
+
+@unittest.skipIf(ed25519_numpy is None, "NumPy is not installed")
+class NumPyEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(25519)
+
+    def test_field(self):
+        q = ed25519.q
+        a = [self.rnd.randrange(q) for _ in range(100)] + [0, 1, q - 1, q, 2**255 - 1]
+        b = [self.rnd.randrange(q) for _ in range(100)] + [q - 1, q - 1, q - 1, 5, 2**255 - 1]
+        fa, fb = ed25519_numpy.fe_from_ints(a), ed25519_numpy.fe_from_ints(b)
+        self.assertEqual(ed25519_numpy.fe_to_ints(fa), [x % q for x in a])
+        self.assertEqual(
+            ed25519_numpy.fe_to_ints(ed25519_numpy.fe_add(fa, fb)),
+            [(x + y) % q for x, y in zip(a, b)])
+        self.assertEqual(
+            ed25519_numpy.fe_to_ints(ed25519_numpy.fe_sub(fa, fb)),
+            [(x - y) % q for x, y in zip(a, b)])
+        self.assertEqual(
+            ed25519_numpy.fe_to_ints(ed25519_numpy.fe_mul(fa, fb)),
+            [x * y % q for x, y in zip(a, b)])
+
+    def test_scalarmult(self):
+        points = [ed25519.scalarmult_base(self.rnd.randrange(ed25519.l)) for _ in range(30)]
+        points.append(ed25519.ident)
+        scalars = [self.rnd.randrange(2**256) for _ in range(28)] + [0, 1, ed25519.l]
+        self.assertEqual(
+            ed25519.batch_encodepoint(ed25519_numpy.batch_scalarmult(points, scalars)),
+            [ed25519.encodepoint(ed25519.scalarmult(ed25519.compress(P), e))
+             for P, e in zip(points, scalars)])
+
+    def test_scalarmult_base(self):
+        scalars = [self.rnd.randrange(2**256) for _ in range(29)] + [0, 1, ed25519.l]
+        self.assertEqual(
+            ed25519.batch_encodepoint(ed25519_numpy.batch_scalarmult_base(scalars)),
+            [ed25519.encodepoint(ed25519.scalarmult(ed25519.B, e)) for e in scalars])
+
+    def test_chunks(self):
+        chunk = ed25519_numpy.CHUNK
+        try:
+            ed25519_numpy.CHUNK = 7
+            scalars = [self.rnd.randrange(ed25519.l) for _ in range(20)]
+            self.assertEqual(
+                ed25519.batch_encodepoint(ed25519_numpy.batch_scalarmult_base(scalars)),
+                [ed25519.public_from_secret(ed25519.encodeint(e)) for e in scalars])
+        finally:
+            ed25519_numpy.CHUNK = chunk
+        self.assertEqual(ed25519_numpy.batch_scalarmult_base([]), [])
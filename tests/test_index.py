@@ -0,0 +1,68 @@
+from binascii import hexlify, unhexlify
+import os
+import pickle
+import unittest
+
+from uplexa import base58
+from uplexa.backends.offline import OfflineWallet
+from uplexa.index import SubaddressIndex
+from uplexa.wallet import Wallet
+from tests.utils import (
+    MAINNET_ADDRESS, MAINNET_VIEW_KEY, address_keys, load_subaddresses, temp_dir)
+
+
+class SubaddressIndexTestCase(unittest.TestCase):
+    addr = MAINNET_ADDRESS
+    svk = MAINNET_VIEW_KEY
+
+    def setUp(self):
+        self.subaddresses = load_subaddresses()
+        self.path = os.path.join(temp_dir(self), 'subaddrs.idx')
+
+    def _wallet(self, index):
+        return Wallet(OfflineWallet(self.addr, view_key=self.svk), index=index)
+
+    def test_build(self):
+        with SubaddressIndex(self.path) as index:
+            self.assertIsNone(index.address)
+            self.assertEqual(len(index), 0)
+            wallet = self._wallet(index)
+            for major in range(2):
+                wallet.get_addresses(major, range(len(self.subaddresses[major])))
+            wallet.get_address(1, 3)
+            self.assertEqual(index.address, self.addr)
+            self.assertEqual(
+                len(index), len(self.subaddresses[0]) + len(self.subaddresses[1]))
+            self.assertEqual(index.max_minor(1), len(self.subaddresses[1]) - 1)
+            self.assertIsNone(index.max_minor(2))
+        with SubaddressIndex(self.path) as index:
+            for major in range(2):
+                for minor, addr in enumerate(self.subaddresses[major]):
+                    data = unhexlify(base58.decode(addr))
+                    self.assertEqual(index[data[1:33]], (major, minor))
+                    self.assertIn(data[1:33], index)
+                    self.assertEqual(index.get(hexlify(data[1:33]).decode()), (major, minor))
+                    self.assertEqual(index.get_address(addr), (major, minor))
+                    self.assertEqual(index.get_address(data), (major, minor))
+            unknown = address_keys(self.subaddresses[2][1])[0]
+            self.assertNotIn(unknown, index)
+            self.assertIsNone(index.get(unknown))
+            self.assertIsNone(index.get_address(self.subaddresses[2][1]))
+            self.assertRaises(KeyError, index.__getitem__, unknown)
+
+    def test_other_wallet(self):
+        with SubaddressIndex(self.path) as index:
+            index.attach(self.subaddresses[1][0])
+            wallet = self._wallet(index)
+            self.assertRaises(ValueError, wallet.get_address, 0, 1)
+            self.assertEqual(len(index), 0)
+
+    def test_pickle(self):
+        with SubaddressIndex(self.path) as index:
+            self._wallet(index).get_addresses(0, range(5))
+            with pickle.loads(pickle.dumps(index)) as copy:
+                self.assertEqual(copy.path, self.path)
+                self.assertEqual(len(copy), 5)
+        with SubaddressIndex(':memory:') as index:
+            self._wallet(index).get_addresses(0, range(5))
+            self.assertRaises(TypeError, pickle.dumps, index)
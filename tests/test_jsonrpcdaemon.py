@@ -0,0 +1,56 @@
+from binascii import unhexlify
+import json
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from uplexa.daemon import Daemon
+from uplexa.backends.jsonrpc import JSONRPCDaemon, RPCError
+
+class JSONRPCDaemonTestCase(unittest.TestCase):
+    key_images = [
+        '34229b30e9339427948191e467b3ccd28252d4b70db3a13a2865002a7e84f386',
+        'fa188a45a0e4daccc0e6d4f6f6858fd46392104be74183ec0047e7e9f4eaf739',
+        '54863a0464c008acc99cffb179bc6cf34eb1bbdf6c29f7a070a7c6376ae30ab5']
+
+    @patch('uplexa.backends.jsonrpc.requests.post')
+    def test_key_images_spent(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.side_effect = [
+            {'spent_status': [0, 1], 'status': 'OK', 'untrusted': False},
+            {'spent_status': [2], 'status': 'OK', 'untrusted': False}]
+        daemon = Daemon(JSONRPCDaemon())
+        self.assertEqual(
+            daemon.key_images_spent(
+                [self.key_images[0], unhexlify(self.key_images[1]), self.key_images[2]],
+                chunk_size=2),
+            [0, 1, 2])
+        self.assertEqual(mock_post.call_count, 2)
+        args, kwargs = mock_post.call_args_list[0]
+        self.assertTrue(args[0].endswith('/is_key_image_spent'))
+        self.assertEqual(json.loads(kwargs['data']), {'key_images': self.key_images[:2]})
+        args, kwargs = mock_post.call_args_list[1]
+        self.assertEqual(json.loads(kwargs['data']), {'key_images': self.key_images[2:]})
+
+    @patch('uplexa.backends.jsonrpc.requests.post')
+    def test_key_images_spent_bytes(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {
+            'spent_status': [0, 1, 2], 'status': 'OK', 'untrusted': False}
+        daemon = Daemon(JSONRPCDaemon())
+        self.assertEqual(
+            daemon.key_images_spent(
+                [self.key_images[0].encode(), bytearray(unhexlify(self.key_images[1])),
+                 bytearray(self.key_images[2].encode())]),
+            [0, 1, 2])
+        args, kwargs = mock_post.call_args
+        self.assertEqual(json.loads(kwargs['data']), {'key_images': self.key_images})
+
+    @patch('uplexa.backends.jsonrpc.requests.post')
+    def test_key_images_spent_failed(self, mock_post):
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {'status': 'Failed', 'untrusted': False}
+        daemon = Daemon(JSONRPCDaemon())
+        self.assertRaises(RPCError, daemon.key_images_spent, self.key_images)
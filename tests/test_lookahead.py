@@ -0,0 +1,81 @@
+import copy as copy_
+import os
+import pickle
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+from uplexa.backends.offline import OfflineWallet
+from uplexa.index import SubaddressIndex
+from uplexa.lookahead import SubaddressLookahead
+from uplexa.wallet import Wallet
+from tests.utils import (
+    MAINNET_ADDRESS, MAINNET_VIEW_KEY, address_keys, load_subaddresses, temp_dir)
+
+
+class SubaddressLookaheadTestCase(unittest.TestCase):
+    addr = MAINNET_ADDRESS
+    svk = MAINNET_VIEW_KEY
+
+    def setUp(self):
+        self.subaddresses = load_subaddresses()
+        self.wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk))
+
+    def _key(self, major, minor):
+        return address_keys(self.subaddresses[major][minor])[0]
+
+    def test_window(self):
+        with patch.object(Wallet, 'iter_addresses', autospec=True,
+                side_effect=Wallet.iter_addresses) as derive:
+            la = SubaddressLookahead(self.wallet, size=5)
+            self.assertEqual(la.used(0), 0)
+            self.assertEqual(la.window(0), range(6))
+            self.assertEqual(len(la), 6)
+            for minor in range(6):
+                self.assertIn(self._key(0, minor), la)
+            self.assertNotIn(self._key(0, 6), la)
+            self.assertIsNone(la.get(self._key(0, 6)))
+            self.assertRaises(KeyError, la.__getitem__, self._key(0, 6))
+            self.assertEqual(la[self._key(0, 3)], (0, 3))
+            self.assertEqual(la.used(0), 3)
+            self.assertEqual(la.window(0), range(9))
+            self.assertEqual(la.get(self._key(0, 8)), (0, 8))
+            self.assertEqual(la.window(0), range(14))
+            # lower indexes don't move the window
+            self.assertEqual(la.get(self._key(0, 1)), (0, 1))
+            self.assertEqual(la.window(0), range(14))
+            la.mark_used(1, 2)
+            self.assertEqual(la.window(1), range(8))
+            self.assertEqual(la.get(self._key(1, 7)), (1, 7))
+            self.assertEqual(
+                [(c[0][1], list(c[0][2])) for c in derive.call_args_list],
+                [(0, list(range(0, 6))), (0, list(range(6, 9))), (0, list(range(9, 14))),
+                 (1, list(range(0, 8))), (1, list(range(8, 13)))])
+        self.assertEqual(la.table(), la._table)
+        self.assertIsNot(la.table(), la._table)
+        for copy in (pickle.loads(pickle.dumps(la)), copy_.copy(la), copy_.deepcopy(la)):
+            self.assertIsInstance(copy, SubaddressLookahead)
+            self.assertEqual(copy.window(0), range(14))
+            self.assertEqual(copy.get(self._key(1, 7)), (1, 7))
+
+    def test_index(self):
+        path = os.path.join(temp_dir(self), 'subaddrs.idx')
+        with SubaddressIndex(path) as index:
+            wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk), index=index)
+            la = SubaddressLookahead(wallet, size=5)
+            la.mark_used(1, 4)
+            self.assertEqual(len(index), 6 + 10)
+        with SubaddressIndex(path) as index:
+            wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk), index=index)
+            with patch.object(Wallet, 'iter_addresses', autospec=True,
+                    side_effect=Wallet.iter_addresses) as derive:
+                la = SubaddressLookahead(wallet, size=5)
+                self.assertFalse(derive.called)
+                self.assertEqual(la.get(self._key(1, 9)), (1, 9))
+                self.assertEqual(la.used(1), 9)
+                self.assertEqual(
+                    [(c[0][1], list(c[0][2])) for c in derive.call_args_list],
+                    [(1, list(range(10, 15)))])
+            self.assertEqual(len(index), 6 + 15)
@@ -1,6 +1,12 @@
+from binascii import unhexlify
+import itertools
 import json
 import os
 import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
 
 from uplexa.backends.offline import OfflineWallet
 from uplexa.wallet import Wallet
@@ -31,6 +37,45 @@ class Tests(object):
                 minor += 1
             major += 1
 
+    def test_get_addresses(self):
+        for major, acc in enumerate(self.subaddresses):
+            self.assertEqual(self.wallet.get_addresses(major, range(len(acc))), acc)
+        self.assertEqual(
+            list(self.wallet.iter_addresses(1, [9, 0, 3, 4, 5, 1, 2], chunk_size=3)),
+            [self.subaddresses[1][i] for i in (9, 0, 3, 4, 5, 1, 2)])
+        self.assertEqual(self.wallet.get_addresses(1, []), [])
+        self.assertRaises(ValueError, self.wallet.get_addresses, 0, [1, 2, 2**32])
+
+    def test_get_addresses_parallel(self):
+        for major, acc in enumerate(self.subaddresses[:2]):
+            self.assertEqual(
+                list(self.wallet.iter_addresses(
+                    major, range(len(acc)), chunk_size=3, processes=2)),
+                acc)
+        # unbounded sequence
+        gen = self.wallet.iter_addresses(1, itertools.count(), chunk_size=2, processes=2)
+        self.assertEqual(list(itertools.islice(gen, 5)), self.subaddresses[1][:5])
+        gen.close()
+        self.assertRaises(
+            ValueError, self.wallet.get_addresses, 0, [1, 2, 2**32], processes=2)
+
+    def test_key_snapshot(self):
+        backend = self.wallet._backend
+        with patch.object(backend, 'addresses', wraps=backend.addresses) as addresses, \
+                patch.object(backend, 'view_key', wraps=backend.view_key) as view_key:
+            for minor in range(3):
+                self.assertEqual(self.wallet.get_address(1, minor), self.subaddresses[1][minor])
+            self.assertEqual(addresses.call_count, 1)
+            self.assertEqual(view_key.call_count, 1)
+            keys = self.wallet.key_snapshot()
+            self.assertEqual(keys.address, self.addr)
+            self.assertEqual(keys.view_key, unhexlify(self.svk))
+            self.wallet.refresh()
+            self.assertIsNot(self.wallet.key_snapshot(), keys)
+            self.assertEqual(self.wallet.get_address(1, 1), self.subaddresses[1][1])
+            self.assertEqual(addresses.call_count, 2)
+            self.assertEqual(view_key.call_count, 2)
+
 
 class AddressTestCase(Tests, unittest.TestCase):
     addr = '47ewoP19TN7JEEnFKUJHAYhGxkeTRH82sf36giEp9AcNfDBfkAtRLX7A6rZz18bbNHPNV7ex6WYbMN3aKisFRJZ8Ebsmgef'
@@ -0,0 +1,151 @@
+from binascii import hexlify, unhexlify
+import gc
+import struct
+import unittest
+import weakref
+
+from uplexa import provider
+from uplexa.provider import PythonProvider
+from tests.utils import address_keys, classproperty, load_subaddresses
+
+
+class Tests(object):
+    @classproperty
+    def __test__(cls):
+        return issubclass(cls, unittest.TestCase)
+
+    def setUp(self):
+        self.subaddresses = load_subaddresses(self.net)
+        self.providers = provider.available_providers()
+
+    def test_public_keys(self):
+        psk, pvk = address_keys(self.subaddresses[0][0])
+        for p in self.providers:
+            self.assertEqual(p.public_from_secret(unhexlify(self.ssk)), psk, msg=p.name)
+            self.assertEqual(p.public_from_secret(unhexlify(self.svk)), pvk, msg=p.name)
+
+    def test_subaddresses(self):
+        svk = unhexlify(self.svk)
+        master_psk = address_keys(self.subaddresses[0][0])[0]
+        for p in self.providers:
+            P = p.decodepoint(master_psk)
+            A = p.fixed_base(p.scalarmult_base(svk))
+            aP = p.scalarmult(P, svk)
+            for major, acc in enumerate(self.subaddresses):
+                for minor, subaddr in enumerate(acc):
+                    if major == minor == 0:
+                        continue
+                    m = p.sc_reduce32(p.keccak_256(
+                        b'SubAddr\0' + svk + struct.pack('<II', major, minor)))
+                    D = p.point_add(P, p.scalarmult_base(m))
+                    C = p.point_add(aP, p.scalarmult(A, m))
+                    self.assertEqual(
+                        tuple(p.batch_encodepoint((D, C))),
+                        address_keys(subaddr),
+                        msg='{}: major={}, minor={}'.format(p.name, major, minor))
+                    self.assertEqual(p.encodepoint(p.scalarmult(D, svk)), address_keys(subaddr)[1])
+                    self.assertEqual(p.encodepoint(p.point_sub(D, P)), p.public_from_secret(m))
+
+
+class ProvidersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.providers = provider.available_providers()
+        self.ref = PythonProvider()
+
+    def test_available(self):
+        self.assertIsInstance(self.providers[-1], PythonProvider)
+        self.assertEqual(provider.get_provider().name, self.providers[0].name)
+
+    def test_set_provider(self):
+        current = provider.get_provider()
+        try:
+            p = PythonProvider()
+            provider.set_provider(p)
+            self.assertIs(provider.get_provider(), p)
+        finally:
+            provider.set_provider(current)
+
+    def test_scalars(self):
+        a = self.ref.keccak_256(b'a')
+        b = self.ref.keccak_256(b'b')
+        for p in self.providers:
+            ra, rb = p.sc_reduce32(a), p.sc_reduce32(b)
+            self.assertEqual(ra, self.ref.sc_reduce32(a), msg=p.name)
+            self.assertEqual(p.sc_reduce(a + b), self.ref.sc_reduce(a + b), msg=p.name)
+            self.assertEqual(p.sc_add(ra, rb), self.ref.sc_add(ra, rb), msg=p.name)
+            self.assertEqual(p.sc_sub(ra, rb), self.ref.sc_sub(ra, rb), msg=p.name)
+            self.assertEqual(p.sc_mul(ra, rb), self.ref.sc_mul(ra, rb), msg=p.name)
+            self.assertRaises(ValueError, p.sc_reduce32, a + b)
+            self.assertRaises(ValueError, p.sc_reduce, a)
+
+    def test_batch_scalarmult(self):
+        scalars = [self.ref.sc_reduce32(self.ref.keccak_256(struct.pack('<I', i)))
+                   for i in range(100)]
+        for p in self.providers:
+            P = p.scalarmult_base(scalars[0])
+            for n in (3, 100):
+                self.assertEqual(
+                    p.batch_encodepoint(p.batch_scalarmult_base(scalars[:n])),
+                    [p.public_from_secret(s) for s in scalars[:n]], msg=p.name)
+                expected = [p.encodepoint(p.scalarmult(P, s)) for s in scalars[:n]]
+                self.assertEqual(
+                    p.batch_encodepoint(p.batch_scalarmult(P, scalars[:n])), expected,
+                    msg=p.name)
+                self.assertEqual(
+                    p.batch_encodepoint(p.batch_scalarmult(p.fixed_base(P), scalars[:n])),
+                    expected, msg=p.name)
+
+    def test_fixed_base_freed(self):
+        P = self.ref.scalarmult_base(self.ref.keccak_256(b'fb'))
+        fb = self.ref.fixed_base(P)
+        self.assertEqual(
+            self.ref.encodepoint(self.ref.batch_scalarmult(fb, [b'\x05' + b'\0' * 31] * 70)[0]),
+            self.ref.encodepoint(self.ref.scalarmult(P, b'\x05' + b'\0' * 31)))
+        ref = weakref.ref(fb)
+        del fb
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_edge_cases(self):
+        zero = b'\x00' * 32
+        ident = b'\x01' + b'\x00' * 31
+        # a point of order 4
+        small = unhexlify('0000000000000000000000000000000000000000000000000000000000000080')
+        s = self.ref.sc_reduce32(self.ref.keccak_256(b's'))
+        for p in self.providers:
+            self.assertEqual(p.public_from_secret(zero), ident, msg=p.name)
+            self.assertEqual(
+                p.encodepoint(p.scalarmult(p.decodepoint(small), s)),
+                self.ref.encodepoint(self.ref.scalarmult(self.ref.decodepoint(small), s)),
+                msg=p.name)
+            P = p.scalarmult_base(s)
+            self.assertEqual(p.encodepoint(p.point_sub(P, P)), ident, msg=p.name)
+            self.assertRaises(ValueError, p.decodepoint, b'\x02' + b'\x00' * 31)
+            # unreduced scalars, also with bit 255 set
+            for u in (b'\xff' * 32, b'\xee' * 31 + b'\x7f', b'\x01' + b'\x00' * 30 + b'\x80'):
+                self.assertEqual(p.public_from_secret(u), self.ref.public_from_secret(u),
+                                 msg=p.name)
+                for Q in (P, p.decodepoint(small)):
+                    self.assertEqual(
+                        p.encodepoint(p.scalarmult(Q, u)),
+                        self.ref.encodepoint(self.ref.scalarmult(
+                            self.ref.decodepoint(p.encodepoint(Q)), u)),
+                        msg=p.name)
+
+
+class MainnetTestCase(Tests, unittest.TestCase):
+    ssk = 'e0fe01d5794e240a26609250c0d7e01673219eececa3f499d5cfa20a75739b0a'
+    svk = '6d9056aa2c096bfcd2f272759555e5764ba204dd362604a983fa3e0aafd35901'
+    net = 'mainnet'
+
+
+class TestnetTestCase(Tests, unittest.TestCase):
+    ssk = '4f5b7af2c1942067ba33d34318b9735cb46ab5d50b75294844c82a9dd872c201'
+    svk = '60cf228f2bf7f6a70643afe9468fde254145dbd3aab4072ede14bf8bae914103'
+    net = 'testnet'
+
+
+class StagenetTestCase(Tests, unittest.TestCase):
+    ssk = 'a8733c61797115db4ec8a5ce39fb811f81dd4ec163b880526683e059c7e62503'
+    svk = 'fd5c0d25f8f994268079a4f7844274dc870a7c2b88fbfc24ba318375e1d9430f'
+    net = 'stagenet'
@@ -0,0 +1,47 @@
+from binascii import unhexlify
+import unittest
+
+from uplexa import ed25519
+from uplexa import scalar
+
+
+def sc(n):
+    return ed25519.encodeint(n % ed25519.l)
+
+
+class ScalarTestCase(unittest.TestCase):
+    a = 2**255 + 2**200 + 12345
+    b = ed25519.l - 3
+    c = 2**64 + 1
+
+    def test_reduce(self):
+        wide = unhexlify('ff' * 64)
+        self.assertEqual(scalar.sc_reduce(wide), sc(2**512 - 1))
+        self.assertEqual(scalar.sc_reduce32(unhexlify('ff' * 32)), sc(2**256 - 1))
+        self.assertEqual(scalar.sc_reduce32(bytearray(sc(7))), sc(7))
+        self.assertRaises(ValueError, scalar.sc_reduce, unhexlify('ff' * 32))
+        self.assertRaises(ValueError, scalar.sc_reduce32, wide)
+
+    def test_check(self):
+        self.assertTrue(scalar.sc_check(sc(ed25519.l - 1)))
+        self.assertFalse(scalar.sc_check(ed25519.encodeint(ed25519.l)))
+        self.assertFalse(scalar.sc_check(b'\x00' * 31))
+
+    def test_arithmetic(self):
+        a, b, c = ed25519.encodeint(self.a), sc(self.b), sc(self.c)
+        self.assertEqual(scalar.sc_add(a, b), sc(self.a + self.b))
+        self.assertEqual(scalar.sc_sub(b, a), sc(self.b - self.a))
+        self.assertEqual(scalar.sc_sub(a, a), sc(0))
+        self.assertEqual(scalar.sc_mul(a, b), sc(self.a * self.b))
+        self.assertEqual(scalar.sc_muladd(a, b, c), sc(self.a * self.b + self.c))
+
+    def test_batch(self):
+        aa = [sc(self.a + i) for i in range(5)]
+        bb = [sc(self.b * i) for i in range(5)]
+        self.assertEqual(scalar.batch_sc_add(aa, bb), list(map(scalar.sc_add, aa, bb)))
+        self.assertEqual(scalar.batch_sc_sub(aa, bb), list(map(scalar.sc_sub, aa, bb)))
+        self.assertEqual(scalar.batch_sc_mul(aa, bb), list(map(scalar.sc_mul, aa, bb)))
+        self.assertEqual(
+            scalar.batch_sc_muladd(aa, bb, aa), list(map(scalar.sc_muladd, aa, bb, aa)))
+        self.assertEqual(scalar.batch_sc_reduce32(aa), aa)
+        self.assertEqual(scalar.batch_sc_reduce([aa[0] * 2]), [sc(self.a * (2**256 + 1))])
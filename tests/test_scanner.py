@@ -0,0 +1,150 @@
+from binascii import hexlify, unhexlify
+from decimal import Decimal
+import os
+import pickle
+import struct
+import unittest
+
+from uplexa import crypto
+from uplexa import ed25519
+from uplexa import scalar
+from uplexa.backends.offline import OfflineWallet
+from uplexa.index import SubaddressIndex
+from uplexa.lookahead import SubaddressLookahead
+from uplexa.numbers import PaymentID
+from uplexa.scanner import OutputScanner, parse_extra
+from uplexa.wallet import Wallet
+from tests.utils import (
+    MAINNET_ADDRESS, MAINNET_VIEW_KEY, address_keys, load_subaddresses, temp_dir)
+
+
+class ScannerTestCase(unittest.TestCase):
+    addr = MAINNET_ADDRESS
+    svk = MAINNET_VIEW_KEY
+
+    def setUp(self):
+        self.subaddresses = load_subaddresses()
+        self.table = {}
+        for major, acc in enumerate(self.subaddresses[:2]):
+            for minor, addr in enumerate(acc[:10]):
+                self.table[address_keys(addr)[0]] = (major, minor)
+
+    def _output(self, derivation, idx, spend_key, amount):
+        key = crypto.derive_public_key(derivation, idx, spend_key)
+        secret = crypto.derivation_to_scalar(derivation, idx)
+        enc = bytearray(a ^ b for a, b in zip(
+            bytearray(struct.pack('<Q', amount)),
+            bytearray(crypto.cn_fast_hash(b'amount' + secret))))
+        return {'amount': 0, 'target': {'key': hexlify(key).decode()}}, \
+            {'amount': hexlify(enc).decode()}
+
+    def _tx(self):
+        # a payment to the master address, one to subaddress 1/4 and one to a stranger
+        r = scalar.sc_reduce32(crypto.cn_fast_hash(b'tx secret'))
+        master_psk, master_pvk = address_keys(self.addr)
+        sub_psk, sub_pvk = address_keys(self.subaddresses[1][4])
+        stranger = ed25519.public_from_secret(scalar.sc_reduce32(crypto.cn_fast_hash(b'x')))
+        txkey = ed25519.public_from_secret(r)
+        additional = [
+            ed25519.public_from_secret(scalar.sc_reduce32(crypto.cn_fast_hash(b'add0'))),
+            ed25519.encodepoint_ext(ed25519.scalarmult_ext(
+                ed25519.decodepoint_ext(sub_psk), ed25519.decodeint(r))),
+            ed25519.public_from_secret(scalar.sc_reduce32(crypto.cn_fast_hash(b'add2')))]
+        der = crypto.generate_key_derivation(master_pvk, r)
+        vouts, ecdh = zip(
+            self._output(der, 0, master_psk, 1500000000000),
+            self._output(crypto.generate_key_derivation(sub_pvk, r), 1, sub_psk, 7),
+            self._output(der, 2, stranger, 100))
+        pid = bytearray(a ^ b for a, b in zip(
+            bytearray(unhexlify('1234567890abcdef')),
+            bytearray(crypto.cn_fast_hash(der + b'\x8d'))))
+        extra = bytearray(b'\x01' + txkey + b'\x02\x09\x01') + pid[:8] \
+            + b'\x04\x03' + b''.join(additional)
+        return {
+            'version': 2,
+            'vin': [],
+            'vout': list(vouts),
+            'extra': list(extra),
+            'rct_signatures': {'type': 5, 'ecdhInfo': list(ecdh)},
+        }
+
+    def test_parse_extra(self):
+        tx = self._tx()
+        extra = parse_extra(tx['extra'])
+        self.assertEqual(len(extra['pubkeys']), 1)
+        self.assertEqual(len(extra['additional_pubkeys']), 3)
+        self.assertIsNone(extra['payment_id'])
+        self.assertEqual(len(extra['encrypted_payment_id']), 8)
+        pid = b'\xaa' * 32
+        extra = parse_extra(bytearray(b'\x02\x21\x00') + pid + b'\x01' + b'\x05' * 10)
+        self.assertEqual(extra['payment_id'], pid)
+        self.assertEqual(extra['pubkeys'], [])
+        self.assertEqual(parse_extra(b'')['pubkeys'], [])
+
+    def test_scan(self):
+        scanner = OutputScanner(self.svk, self.table)
+        outs = scanner.scan(self._tx())
+        self.assertEqual(len(outs), 2)
+        self.assertEqual(outs[0].index, 0)
+        self.assertEqual(outs[0].subaddress, (0, 0))
+        self.assertEqual(outs[0].amount, Decimal('1.5'))
+        self.assertEqual(outs[0].payment_id, PaymentID('1234567890abcdef'))
+        self.assertEqual(outs[1].index, 1)
+        self.assertEqual(outs[1].subaddress, (1, 4))
+        self.assertEqual(outs[1].amount, Decimal('0.000000000007'))
+
+    def test_scan_unrelated(self):
+        scanner = OutputScanner(self.svk, self.table)
+        tx = self._tx()
+        tx['vout'] = tx['vout'][2:]
+        self.assertEqual(scanner.scan(tx), [])
+        tx['extra'] = []
+        self.assertEqual(scanner.scan(tx), [])
+
+    def test_scan_many(self):
+        scanner = OutputScanner(unhexlify(self.svk), self.table)
+        txs = [self._tx(), {'version': 2, 'vout': [], 'extra': []}, self._tx()]
+        for processes in (1, 2):
+            res = list(scanner.scan_many(txs, processes=processes, chunksize=1))
+            self.assertEqual([len(outs) for outs in res], [2, 0, 2])
+            self.assertEqual(res[2][1].subaddress, (1, 4))
+
+    def test_from_wallet(self):
+        wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk))
+        scanner = OutputScanner.from_wallet(wallet, majors=range(2), minors=range(5))
+        self.assertEqual(len(scanner.subaddresses), 10)
+        self.assertEqual(len(scanner.scan(self._tx())), 2)
+
+    def test_lookahead(self):
+        wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk))
+        lookahead = SubaddressLookahead(wallet, size=5)
+        lookahead.mark_used(1, 0)
+        scanner = OutputScanner(self.svk, lookahead)
+        outs = scanner.scan(self._tx())
+        self.assertEqual([o.subaddress for o in outs], [(0, 0), (1, 4)])
+        self.assertEqual(lookahead.window(1), range(10))
+        copy = pickle.loads(pickle.dumps(scanner))
+        self.assertEqual(copy.subaddresses, lookahead.table())
+        self.assertIs(scanner.subaddresses, lookahead)
+        res = list(scanner.scan_many([self._tx()], processes=2))
+        self.assertEqual([o.subaddress for o in res[0]], [(0, 0), (1, 4)])
+
+    def test_index(self):
+        tmp = temp_dir(self)
+        with SubaddressIndex(os.path.join(tmp, 'subaddrs.idx')) as index:
+            wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk), index=index)
+            for major in range(2):
+                wallet.get_addresses(major, range(10))
+            scanner = OutputScanner(self.svk, index)
+            self.assertIs(scanner.subaddresses, index)
+            txs = [self._tx(), self._tx()]
+            for processes in (1, 2):
+                res = list(scanner.scan_many(txs, processes=processes))
+                self.assertEqual([o.subaddress for o in res[1]], [(0, 0), (1, 4)])
+        with SubaddressIndex(':memory:') as index:
+            wallet = Wallet(OfflineWallet(self.addr, view_key=self.svk), index=index)
+            wallet.get_addresses(1, range(10))
+            scanner = OutputScanner(self.svk, index)
+            self.assertEqual(len(list(scanner.scan_many(txs, processes=1))), 2)
+            with self.assertRaises(TypeError):
+                list(scanner.scan_many(txs, processes=2))
@@ -1,3 +1,15 @@
+from binascii import unhexlify
+import json
+import os
+import shutil
+import tempfile
+
+from uplexa import base58
+
+MAINNET_ADDRESS = '47ewoP19TN7JEEnFKUJHAYhGxkeTRH82sf36giEp9AcNfDBfkAtRLX7A6rZz18bbNHPNV7ex6WYbMN3aKisFRJZ8Ebsmgef'
+MAINNET_VIEW_KEY = '6d9056aa2c096bfcd2f272759555e5764ba204dd362604a983fa3e0aafd35901'
+
+
 class ClassPropertyDescriptor(object):
     """Based on https://stackoverflow.com/questions/5189699/how-to-make-a-class-property"""
 
@@ -12,3 +24,22 @@ class ClassPropertyDescriptor(object):
 
 def classproperty(func):
     return ClassPropertyDescriptor(classmethod(func))
+
+
+def load_subaddresses(net='mainnet'):
+    """Returns the subaddresses of the test wallet of `net`, as lists for each account."""
+    with open(os.path.join(os.path.dirname(__file__), 'data', '{}-subaddrs.json'.format(net))) as f:
+        return json.load(f)
+
+
+def address_keys(addr):
+    """Returns the public spend and view keys of base58 address `addr`."""
+    data = unhexlify(base58.decode(addr))
+    return data[1:33], data[33:65]
+
+
+def temp_dir(testcase):
+    """Creates a temporary directory which is removed when `testcase` finishes."""
+    path = tempfile.mkdtemp()
+    testcase.addCleanup(shutil.rmtree, path)
+    return path
@@ -5,19 +5,25 @@ import struct
 import sys
 
 from . import base58
-from . import ed25519
+from .cache import LRUCache
 from . import numbers
+from . import provider
 
 if sys.version_info < (3,): # pragma: no cover
     _str_types = (str, bytes, unicode)
+    _byte = lambda data, i: ord(data[i])
 else:                       # pragma: no cover
     _str_types = (str, bytes)
+    _byte = lambda data, i: data[i]
 
 _ADDR_REGEX = re.compile(r'^[123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz]{98}$')
 _IADDR_REGEX = re.compile(r'^[123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz]{109}$')
+_NETS = ('mainnet', 'testnet', 'stagenet')
 
 class BaseAddress(object):
-    label = None
+    # the decoded address is kept as bytes, which are compared between addresses,
+    # the base58 form is cached and hashed
+    __slots__ = ('_decoded', '_encoded', 'label')
 
     def __init__(self, addr, label=None):
         addr = str(addr)
@@ -25,50 +31,112 @@ class BaseAddress(object):
             raise ValueError("Address must be 98 characters long base58-encoded string, "
                 "is {addr} ({len} chars length)".format(addr=addr, len=len(addr)))
         self._decode(addr)
-        self.label = label or self.label
+        self._encoded = addr
+        self.label = label
+
+    @classmethod
+    def from_keys(cls, net, spend, view, label=None):
+        """Builds the address from public keys, without encoding or validating it.
+        The base58 form is computed when first needed.
+
+        :param net: the network, one of 'mainnet', 'testnet', 'stagenet'
+        :param spend: public spend key, as 32 bytes or hexadecimal string
+        :param view: public view key, as 32 bytes or hexadecimal string
+        :param label: a label for the address (defaults to `None`)
+        """
+        return cls._from_data(cls._netbyte(net) + _key_bytes(spend) + _key_bytes(view), label)
+
+    @classmethod
+    def _from_data(cls, data, label=None):
+        # data without the checksum, known to be valid
+        data = bytearray(data)
+        return cls._from_bytes(data + keccak_256(data).digest()[:4], label)
+
+    @classmethod
+    def _from_bytes(cls, decoded, label=None):
+        # decoded address with the checksum, known to be valid
+        addr = cls.__new__(cls)
+        addr._decoded = bytes(decoded)
+        addr._encoded = None
+        addr.label = label
+        return addr
+
+    @classmethod
+    def _netbyte(cls, net):
+        if net not in _NETS:
+            raise ValueError(
+                "Invalid net argument. Must be one of ('mainnet', 'testnet', 'stagenet').")
+        return bytearray([cls._valid_netbytes[_NETS.index(net)]])
+
+    def _net(self):
+        return _NETS[self._valid_netbytes.index(_byte(self._decoded, 0))]
 
     def is_mainnet(self):
         """Returns `True` if the address belongs to mainnet.
 
         :rtype: bool
         """
-        return self._decoded[0] == self._valid_netbytes[0]
+        return _byte(self._decoded, 0) == self._valid_netbytes[0]
 
     def is_testnet(self):
         """Returns `True` if the address belongs to testnet.
 
         :rtype: bool
         """
-        return self._decoded[0] == self._valid_netbytes[1]
+        return _byte(self._decoded, 0) == self._valid_netbytes[1]
 
     def is_stagenet(self):
         """Returns `True` if the address belongs to stagenet.
 
         :rtype: bool
         """
-        return self._decoded[0] == self._valid_netbytes[2]
+        return _byte(self._decoded, 0) == self._valid_netbytes[2]
+
+    def view_key(self):
+        """Returns public view key.
+
+        :rtype: str
+        """
+        return hexlify(self._decoded[33:65]).decode()
+
+    def spend_key(self):
+        """Returns public spend key.
+
+        :rtype: str
+        """
+        return hexlify(self._decoded[1:33]).decode()
 
     def _decode(self, address):
-        self._decoded = bytearray(unhexlify(base58.decode(address)))
-        checksum = self._decoded[-4:]
-        if checksum != keccak_256(self._decoded[:-4]).digest()[:4]:
+        self._decoded = self._verify(base58.decode_bytes(address), address)
+
+    @classmethod
+    def _verify(cls, decoded, address):
+        if decoded[-4:] != keccak_256(decoded[:-4]).digest()[:4]:
             raise ValueError("Invalid checksum in address {}".format(address))
-        if self._decoded[0] not in self._valid_netbytes:
+        if _byte(decoded, 0) not in cls._valid_netbytes:
             raise ValueError("Invalid address netbyte {nb}. Allowed values are: {allowed}".format(
-                nb=self._decoded[0],
-                allowed=", ".join(map(lambda b: '%02x' % b, self._valid_netbytes))))
+                nb=_byte(decoded, 0),
+                allowed=", ".join(map(lambda b: '%02x' % b, cls._valid_netbytes))))
+        return decoded
 
     def __repr__(self):
-        return base58.encode(hexlify(self._decoded))
+        if self._encoded is None:
+            self._encoded = base58.encode_bytes(self._decoded)
+        return self._encoded
 
     def __eq__(self, other):
         if isinstance(other, BaseAddress):
-            return str(self) == str(other)
+            return self._decoded == other._decoded
         if isinstance(other, _str_types):
             return str(self) == other
-        return super(BaseAddress, self).__eq__(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        res = self.__eq__(other)
+        return res if res is NotImplemented else not res
 
     def __hash__(self):
+        # equal to the string form, so addresses and strings may be mixed in sets and dicts
         return hash(str(self))
 
 
@@ -80,36 +148,23 @@ class Address(BaseAddress):
     :param address: a uPlexa address as string-like object
     :param label: a label for the address (defaults to `None`)
     """
+    __slots__ = ()
     _valid_netbytes = (18, 53, 24)
     # NOTE: _valid_netbytes order is (mainnet, testnet, stagenet)
 
-    def view_key(self):
-        """Returns public view key.
-
-        :rtype: str
-        """
-        return hexlify(self._decoded[33:65]).decode()
-
-    def spend_key(self):
-        """Returns public spend key.
-
-        :rtype: str
-        """
-        return hexlify(self._decoded[1:33]).decode()
-
     def check_private_view_key(self, key):
         """Checks if private view key matches this address.
 
         :rtype: bool
         """
-        return ed25519.public_from_secret_hex(key) == self.view_key()
+        return provider.get_provider().public_from_secret(unhexlify(key)) == self._decoded[33:65]
 
     def check_private_spend_key(self, key):
         """Checks if private spend key matches this address.
 
         :rtype: bool
         """
-        return ed25519.public_from_secret_hex(key) == self.spend_key()
+        return provider.get_provider().public_from_secret(unhexlify(key)) == self._decoded[1:33]
 
     def with_payment_id(self, payment_id=0):
         """Integrates payment id into the address.
@@ -123,10 +178,9 @@ class Address(BaseAddress):
         payment_id = numbers.PaymentID(payment_id)
         if not payment_id.is_short():
             raise TypeError("Payment ID {0} has more than 64 bits and cannot be integrated".format(payment_id))
-        prefix = 54 if self.is_testnet() else 25 if self.is_stagenet() else 19
-        data = bytearray([prefix]) + self._decoded[1:65] + struct.pack('>Q', int(payment_id))
-        checksum = bytearray(keccak_256(data).digest()[:4])
-        return IntegratedAddress(base58.encode(hexlify(data + checksum)))
+        return IntegratedAddress._from_data(
+            IntegratedAddress._netbyte(self._net()) + self._decoded[1:65]
+            + struct.pack('>Q', int(payment_id)))
 
 
 class SubAddress(BaseAddress):
@@ -135,6 +189,7 @@ class SubAddress(BaseAddress):
     Any type of address which is not the master one for a wallet.
     """
 
+    __slots__ = ()
     _valid_netbytes = (42, 63, 36)
     # NOTE: _valid_netbytes order is (mainnet, testnet, stagenet)
 
@@ -148,6 +203,7 @@ class IntegratedAddress(Address):
     A master address integrated with payment id (short one, max 64 bit).
     """
 
+    __slots__ = ()
     _valid_netbytes = (19, 54, 25)
     # NOTE: _valid_netbytes order is (mainnet, testnet, stagenet)
 
@@ -157,6 +213,22 @@ class IntegratedAddress(Address):
             raise ValueError("Integrated address must be 109 characters long base58-encoded string, "
                 "is {addr} ({len} chars length)".format(addr=address, len=len(address)))
         self._decode(address)
+        self._encoded = address
+        self.label = None
+
+    @classmethod
+    def from_keys(cls, net, spend, view, payment_id=0):
+        """Builds the integrated address from public keys and a payment id, without encoding
+        or validating it. The base58 form is computed when first needed.
+
+        :param net: the network, one of 'mainnet', 'testnet', 'stagenet'
+        :param spend: public spend key, as 32 bytes or hexadecimal string
+        :param view: public view key, as 32 bytes or hexadecimal string
+        :param payment_id: int, hexadecimal string or :class:`PaymentID <uplexa.numbers.PaymentID>`
+                    (max 64-bit long)
+        :raises: `TypeError` if the payment id is too long
+        """
+        return Address.from_keys(net, spend, view).with_payment_id(payment_id)
 
     def payment_id(self):
         """Returns the integrated payment id.
@@ -169,33 +241,66 @@ class IntegratedAddress(Address):
         """Returns the base address without payment id.
         :rtype: :class:`Address`
         """
-        prefix = 53 if self.is_testnet() else 24 if self.is_stagenet() else 18
-        data = bytearray([prefix]) + self._decoded[1:65]
-        checksum = keccak_256(data).digest()[:4]
-        return Address(base58.encode(hexlify(data + checksum)))
+        return Address._from_data(Address._netbyte(self._net()) + self._decoded[1:65])
+
+
+def _key_bytes(key):
+    if isinstance(key, _str_types) and len(key) == 64:
+        key = unhexlify(key)
+    if len(key) != 32:
+        raise ValueError("Key must be 32 bytes long, is {0}".format(len(key)))
+    return bytearray(key)
 
 
+_parsed_addresses = LRUCache(4096)
+
 def address(addr, label=None):
     """Discover the proper class and return instance for a given uPlexa address.
 
+    Parsed addresses are kept in a LRU cache keyed by the string, as the same addresses
+    tend to be seen over and over, e.g. in payments. A new object is returned on each call.
+    See :func:`cache_info` and :func:`cache_clear`.
+
     :param addr: the address as a string-like object
     :param label: a label for the address (defaults to `None`)
 
     :rtype: :class:`Address`, :class:`SubAddress` or :class:`IntegratedAddress`
     """
     addr = str(addr)
+    parsed = _parsed_addresses.get(addr)
+    if parsed is None:
+        parsed = _parse(addr)
+        _parsed_addresses.put(addr, parsed)
+    cls, decoded = parsed
+    res = cls._from_bytes(decoded, None if cls is IntegratedAddress else label)
+    res._encoded = addr
+    return res
+
+def cache_info():
+    """Returns statistics of the cache of :func:`address`.
+
+    :rtype: dict with `hits`, `misses`, `size` and `maxsize` keys
+    """
+    return _parsed_addresses.info()
+
+def cache_clear():
+    """Empties the cache of :func:`address` and resets its statistics."""
+    _parsed_addresses.clear()
+
+def _parse(addr):
     if _ADDR_REGEX.match(addr):
-        netbyte = bytearray(unhexlify(base58.decode(addr)))[0]
+        decoded = base58.decode_bytes(addr)
+        netbyte = _byte(decoded, 0)
         if netbyte in Address._valid_netbytes:
-            return Address(addr, label=label)
+            return Address, Address._verify(decoded, addr)
         elif netbyte in SubAddress._valid_netbytes:
-            return SubAddress(addr, label=label)
+            return SubAddress, SubAddress._verify(decoded, addr)
         raise ValueError("Invalid address netbyte {nb:x}. Allowed values are: {allowed}".format(
             nb=netbyte,
             allowed=", ".join(map(
                 lambda b: '%02x' % b,
                 sorted(Address._valid_netbytes + SubAddress._valid_netbytes)))))
     elif _IADDR_REGEX.match(addr):
-        return IntegratedAddress(addr)
+        return IntegratedAddress, IntegratedAddress._verify(base58.decode_bytes(addr), addr)
     raise ValueError("Address must be either 95 or 106 characters long base58-encoded string, "
         "is {addr} ({len} chars length)".format(addr=addr, len=len(addr)))
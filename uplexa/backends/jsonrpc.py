@@ -57,6 +57,12 @@ class JSONRPCDaemon(object):
                 timestamp=datetime.fromtimestamp(tx['receive_time'])))
         return txs
 
+    def key_images_spent(self, key_images):
+        res = self.raw_request('/is_key_image_spent', {'key_images': key_images})
+        if res['status'] == 'OK':
+            return res['spent_status']
+        raise RPCError("Key image check failed with status {status}".format(**res))
+
     def raw_request(self, path, data):
         hdr = {'Content-Type': 'application/json'}
         _log.debug(u"Request: {path}\nData: {data}".format(
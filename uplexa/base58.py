@@ -8,6 +8,15 @@
 # Modified by emesik and rooterkyberian:
 #  + optimized
 #  + proper exceptions instead of returning errors as results
+#  + bytes API with a lookup table
+#  + batch codec for strings of equal length, vectorised with NumPy if available
+
+from binascii import hexlify, unhexlify
+import sys
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 __alphabet = [ord(s) for s in '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz']
 __b58base = 58
@@ -15,6 +24,24 @@ __UINT64MAX = 2**64
 __encodedBlockSizes = [0, 2, 3, 5, 6, 7, 9, 10, 11]
 __fullBlockSize = 8
 __fullEncodedBlockSize = 11
+__decodeTable = [-1] * 256
+for __i, __c in enumerate(__alphabet):
+    __decodeTable[__c] = __i
+del __i, __c
+_NUMPY_THRESHOLD = 16
+
+if sys.version_info < (3,): # pragma: no cover
+    def _be2int(data):
+        return int(hexlify(data) or '0', 16)
+
+    def _int2be(num, size):
+        return unhexlify('%0*x' % (2 * size, num))
+else:                       # pragma: no cover
+    def _be2int(data):
+        return int.from_bytes(data, 'big')
+
+    def _int2be(num, size):
+        return num.to_bytes(size, 'big')
 
 
 def _hexToBin(hex_):
@@ -70,24 +97,25 @@ def encode_block(data, buf, index):
 
 def encode(hex):
     '''Encode hexadecimal string as base58 (ex: encoding a uPlexa address).'''
-    data = _hexToBin(hex)
-    l_data = len(data)
-
-    if l_data == 0:
-        return ""
-
-    full_block_count = l_data // __fullBlockSize
-    last_block_size = l_data % __fullBlockSize
-    res_size = full_block_count * __fullEncodedBlockSize + __encodedBlockSizes[last_block_size]
-
-    res = bytearray([__alphabet[0]] * res_size)
-
-    for i in range(full_block_count):
-        res = encode_block(data[(i*__fullBlockSize):(i*__fullBlockSize+__fullBlockSize)], res, i * __fullEncodedBlockSize)
-
-    if last_block_size > 0:
-        res = encode_block(data[(full_block_count*__fullBlockSize):(full_block_count*__fullBlockSize+last_block_size)], res, full_block_count * __fullEncodedBlockSize)
-
+    if len(hex) % 2 != 0:
+        raise ValueError("Hex string has invalid length: %d" % len(hex))
+    return encode_bytes(unhexlify(hex))
+
+
+def encode_bytes(data):
+    '''Encode bytes as base58 string (ex: encoding a uPlexa address).'''
+    data = bytes(data)
+    res = bytearray()
+    for i in range(0, len(data), __fullBlockSize):
+        block = data[i:i + __fullBlockSize]
+        num = _be2int(block)
+        enc = bytearray([__alphabet[0]] * __encodedBlockSizes[len(block)])
+        j = len(enc) - 1
+        while num > 0:
+            num, remainder = divmod(num, __b58base)
+            enc[j] = __alphabet[remainder]
+            j -= 1
+        res += enc
     return bytes(res).decode('ascii')
 
 
@@ -104,9 +132,9 @@ def decode_block(data, buf, index):
     res_num = 0
     order = 1
     for i in range(l_data-1, -1, -1):
-        digit = __alphabet.index(data[i])
+        digit = __decodeTable[data[i]]
         if digit < 0:
-            raise ValueError("Invalid symbol: %s" % data[i])
+            raise ValueError("Invalid symbol: %s" % chr(data[i]))
 
         product = order * digit + res_num
         if product > __UINT64MAX:
@@ -126,26 +154,97 @@ def decode_block(data, buf, index):
 
 def decode(enc):
     '''Decode a base58 string (ex: a uPlexa address) into hexidecimal form.'''
-    enc = bytearray(enc, encoding='ascii')
-    l_enc = len(enc)
+    return hexlify(decode_bytes(enc)).decode()
 
-    if l_enc == 0:
-        return ""
 
-    full_block_count = l_enc // __fullEncodedBlockSize
-    last_block_size = l_enc % __fullEncodedBlockSize
-    try:
-        last_block_decoded_size = __encodedBlockSizes.index(last_block_size)
-    except ValueError:
+def decode_bytes(enc):
+    '''Decode a base58 string (ex: a uPlexa address) into bytes.'''
+    enc = bytearray(enc, encoding='ascii') if not isinstance(enc, (bytes, bytearray)) \
+        else bytearray(enc)
+    l_enc = len(enc)
+    if l_enc % __fullEncodedBlockSize not in __encodedBlockSizes:
         raise ValueError("Invalid encoded length: %d" % l_enc)
 
-    data_size = full_block_count * __fullBlockSize + last_block_decoded_size
-
-    data = bytearray(data_size)
-    for i in range(full_block_count):
-        data = decode_block(enc[(i*__fullEncodedBlockSize):(i*__fullEncodedBlockSize+__fullEncodedBlockSize)], data, i * __fullBlockSize)
-
-    if last_block_size > 0:
-        data = decode_block(enc[(full_block_count*__fullEncodedBlockSize):(full_block_count*__fullEncodedBlockSize+last_block_size)], data, full_block_count * __fullBlockSize)
-
-    return _binToHex(data)
+    res = []
+    for i in range(0, l_enc, __fullEncodedBlockSize):
+        block = enc[i:i + __fullEncodedBlockSize]
+        size = __encodedBlockSizes.index(len(block))
+        num = 0
+        for c in block:
+            digit = __decodeTable[c]
+            if digit < 0:
+                raise ValueError("Invalid symbol: %s" % chr(c))
+            num = num * __b58base + digit
+        if num >> (8 * size):
+            raise ValueError("Overflow: %d doesn't fit in %d bit(s)" % (num, size))
+        res.append(_int2be(num, size))
+    return b''.join(res)
+
+
+def batch_encode_bytes(data, size):
+    '''Encode a contiguous buffer of items of `size` bytes each (ex: decoded addresses)
+    as a list of base58 strings. Large batches are encoded with NumPy, if it's installed.'''
+    data = bytes(data)
+    if size <= 0 or len(data) % size != 0:
+        raise ValueError("Buffer of %d bytes doesn't hold items of %d bytes" % (len(data), size))
+    count = len(data) // size
+    if np is None or count < _NUMPY_THRESHOLD:
+        return [encode_bytes(data[i:i + size]) for i in range(0, len(data), size)]
+    items = np.frombuffer(data, dtype=np.uint8).reshape(count, size)
+    res = []
+    for i in range(0, size, __fullBlockSize):
+        block = items[:, i:i + __fullBlockSize]
+        padded = np.zeros((count, __fullBlockSize), dtype=np.uint8)
+        padded[:, __fullBlockSize - block.shape[1]:] = block
+        num = padded.view('>u8')[:, 0].astype(np.uint64)
+        enc = np.empty((count, __encodedBlockSizes[block.shape[1]]), dtype=np.uint8)
+        for j in range(enc.shape[1] - 1, -1, -1):
+            enc[:, j] = _npAlphabet[num % np.uint64(__b58base)]
+            num //= np.uint64(__b58base)
+        res.append(enc)
+    enc = np.concatenate(res, axis=1)
+    width = enc.shape[1]
+    raw = enc.tobytes().decode('ascii')
+    return [raw[i:i + width] for i in range(0, len(raw), width)]
+
+
+def batch_decode_bytes(encs):
+    '''Decode a sequence of base58 strings of equal length (ex: addresses) into one
+    contiguous buffer of bytes. Large batches are decoded with NumPy, if it's installed.'''
+    encs = [bytes(e) if isinstance(e, (bytes, bytearray)) else str(e).encode('ascii')
+            for e in encs]
+    if not encs:
+        return b''
+    l_enc = len(encs[0])
+    for enc in encs:
+        if len(enc) != l_enc:
+            raise ValueError("Encoded strings differ in length: %d and %d" % (l_enc, len(enc)))
+    if np is None or len(encs) < _NUMPY_THRESHOLD:
+        return b''.join(decode_bytes(enc) for enc in encs)
+    if l_enc % __fullEncodedBlockSize not in __encodedBlockSizes:
+        raise ValueError("Invalid encoded length: %d" % l_enc)
+    digits = _npDecodeTable[np.frombuffer(b''.join(encs), dtype=np.uint8)].reshape(len(encs), -1)
+    bad = (digits < 0).any(axis=1)
+    res = []
+    for i in range(0, l_enc, __fullEncodedBlockSize):
+        block = digits[:, i:i + __fullEncodedBlockSize].astype(np.uint64)
+        size = __encodedBlockSizes.index(block.shape[1])
+        num = np.zeros(len(encs), dtype=np.uint64)
+        for j in range(block.shape[1]):
+            digit = block[:, j]
+            if j == __fullEncodedBlockSize - 1:
+                # 58**11 exceeds 2**64, the last digit of a full block may overflow
+                bad |= num > (np.uint64(__UINT64MAX - 1) - digit) // np.uint64(__b58base)
+            num = num * np.uint64(__b58base) + digit
+        if size < __fullBlockSize:
+            bad |= (num >> np.uint64(8 * size)) != 0
+        res.append(num.astype('>u8').view(np.uint8).reshape(-1, __fullBlockSize)[:, -size:])
+    if bad.any():
+        # let the scalar code report the first error
+        decode_bytes(encs[int(np.argmax(bad))])
+    return np.concatenate(res, axis=1).tobytes()
+
+
+if np is not None:
+    _npAlphabet = np.array(__alphabet, dtype=np.uint8)
+    _npDecodeTable = np.array(__decodeTable, dtype=np.int16)
@@ -0,0 +1,70 @@
+import collections
+import threading
+
+
+class LRUCache(object):
+    """
+    A bounded, thread-safe mapping which discards the least recently used entries.
+
+    It keeps the number of hits and misses, see :meth:`info`.
+
+    :param maxsize: the maximal number of entries kept
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under `key` and marks it as recently used, or `default`
+        if there's no such key.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores `value` under `key`, evicting the least recently used entry if the cache is full.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """
+        Returns cache statistics.
+
+        :rtype: dict with `hits`, `misses`, `size` and `maxsize` keys
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
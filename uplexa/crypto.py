@@ -0,0 +1,159 @@
+"""
+CryptoNote key derivation primitives.
+
+These follow the functions of the same names in uPlexa's ``crypto.cpp``. Keys and
+derivations are 32-byte strings, output indexes are integers.
+"""
+from binascii import hexlify
+import os
+import struct
+from sha3 import keccak_256
+
+from . import base58
+from . import ed25519
+from . import scalar
+
+
+def cn_fast_hash(data):
+    """Returns the Keccak-256 digest of `data`."""
+    return keccak_256(data).digest()
+
+def hash_to_scalar(data):
+    """Hashes `data` into a scalar reduced modulo `l`."""
+    return scalar.sc_reduce32(cn_fast_hash(data))
+
+def encode_varint(n):
+    """Encodes non-negative integer as a varint (7 bits per byte, little endian)."""
+    res = bytearray()
+    while n >= 0x80:
+        res.append((n & 0x7f) | 0x80)
+        n >>= 7
+    res.append(n)
+    return bytes(res)
+
+def generate_key_derivation(pub, sec):
+    """Returns the shared secret ``8 * sec * pub`` of a public key (usually the transaction
+    public key) and a secret key (usually the private view key).
+
+    :raises: `ValueError` if `pub` is not a valid point
+    """
+    try:
+        P = ed25519.decodepoint_ext(pub)
+    except Exception:
+        raise ValueError("Invalid public key {0}".format(hexlify(pub).decode()))
+    return ed25519.encodepoint_ext(_mul8(ed25519.scalarmult_ext(P, ed25519.decodeint(sec))))
+
+def derivation_to_scalar(derivation, output_index):
+    """Returns ``Hs(derivation || varint(output_index))``."""
+    return hash_to_scalar(bytes(derivation) + encode_varint(output_index))
+
+def derive_public_key(derivation, output_index, base):
+    """Returns the one-time output key ``Hs(derivation || output_index) * G + base``."""
+    s = ed25519.decodeint(derivation_to_scalar(derivation, output_index))
+    return ed25519.encodepoint_ext(
+        ed25519.add(ed25519.scalarmult_base(s), ed25519.decodepoint_ext(base)))
+
+def derive_secret_key(derivation, output_index, base):
+    """Returns the one-time output secret key ``Hs(derivation || output_index) + base``."""
+    return scalar.sc_add(derivation_to_scalar(derivation, output_index), base)
+
+def derive_subaddress_public_key(out_key, derivation, output_index):
+    """Returns the public spend key of the (sub)address an output was sent to,
+    ``out_key - Hs(derivation || output_index) * G``."""
+    s = ed25519.decodeint(derivation_to_scalar(derivation, output_index))
+    return ed25519.encodepoint_ext(
+        ed25519.add(ed25519.decodepoint_ext(out_key), ed25519.neg(ed25519.scalarmult_base(s))))
+
+def get_subaddress_secret_key(sec, major, minor):
+    """Returns the scalar ``m = Hs("SubAddr\\0" || sec || major || minor)`` of the subaddress
+    given by indexes, where `sec` is the private view key. The private spend key of the
+    subaddress is ``m`` added to the wallet's private spend key."""
+    return hash_to_scalar(b'SubAddr\0' + bytes(sec) + struct.pack('<II', major, minor))
+
+def hash_to_ec(key):
+    """Hashes `key` to a point of the prime order subgroup, ``8 * ge_fromfe(keccak(key))``."""
+    return ed25519.encodepoint_ext(_hash_to_ec(key))
+
+def generate_key_image(pub, sec):
+    """Returns the key image ``sec * hash_to_ec(pub)`` of a one-time output key `pub` and
+    its secret key `sec`, see :func:`derive_secret_key`."""
+    return ed25519.encodepoint_ext(ed25519.scalarmult_ext(_hash_to_ec(pub), ed25519.decodeint(sec)))
+
+def generate_signature(prefix_hash, pub, sec):
+    """Signs a 32-byte hash with the secret key `sec`, whose public key is `pub`.
+    Returns the 64-byte signature ``c || r``."""
+    k = scalar.sc_reduce(os.urandom(64))
+    comm = ed25519.public_from_secret(k)
+    c = hash_to_scalar(bytes(prefix_hash) + bytes(pub) + comm)
+    return c + scalar.sc_sub(k, scalar.sc_mul(c, sec))
+
+def check_signature(prefix_hash, pub, sig):
+    """Returns `True` if `sig` is a valid signature of the 32-byte hash by public key `pub`."""
+    return batch_check_signature([prefix_hash], [pub], [sig])[0]
+
+def batch_check_signature(prefix_hashes, pubs, sigs):
+    """Checks a sequence of signatures, returning a list of `bool`. The commitments
+    ``r * G + c * pub`` are encoded with a single field inversion for the whole batch."""
+    prefix_hashes, pubs, sigs = list(prefix_hashes), list(pubs), list(sigs)
+    comms = [_signature_commitment(pub, sig) for pub, sig in zip(pubs, sigs)]
+    points = iter(ed25519.batch_compress(C for C in comms if C is not None))
+    res = []
+    for prefix_hash, pub, sig, C in zip(prefix_hashes, pubs, sigs, comms):
+        if C is None:
+            res.append(False)
+            continue
+        C = next(points)
+        if C == (0, 1):
+            res.append(False)
+            continue
+        res.append(hash_to_scalar(
+            bytes(prefix_hash) + bytes(pub) + ed25519.encodepoint(C)) == bytes(sig[:32]))
+    return res
+
+def generate_message_signature(message, pub, sec):
+    """Signs a message the way the wallet's ``sign`` does, with the private spend key `sec`
+    and public spend key `pub` of the address. Returns a ``SigV1`` string."""
+    return 'SigV1' + base58.encode_bytes(
+        generate_signature(cn_fast_hash(_message_bytes(message)), pub, sec))
+
+def check_message_signature(message, pub, signature):
+    """Returns `True` if `signature` is a valid ``SigV1`` signature of `message` made with
+    the address of public spend key `pub`."""
+    return batch_check_message_signature([message], [pub], [signature])[0]
+
+def batch_check_message_signature(messages, pubs, signatures):
+    """Checks a sequence of message signatures, see :func:`batch_check_signature`."""
+    sigs = []
+    for signature in signatures:
+        try:
+            if not signature.startswith('SigV1'):
+                raise ValueError("Unknown signature version")
+            sig = base58.decode_bytes(signature[5:])
+        except (ValueError, TypeError):
+            sig = b''
+        sigs.append(sig)
+    return batch_check_signature(
+        [cn_fast_hash(_message_bytes(m)) for m in messages], pubs, sigs)
+
+
+def _message_bytes(message):
+    if not isinstance(message, bytes):
+        message = message.encode('utf-8')
+    return message
+
+def _signature_commitment(pub, sig):
+    if len(sig) != 64 or not (scalar.sc_check(sig[:32]) and scalar.sc_check(sig[32:])):
+        return None
+    try:
+        P = ed25519.decodepoint_ext(pub)
+    except Exception:
+        return None
+    return ed25519.add(
+        ed25519.scalarmult_base(ed25519.decodeint(sig[32:])),
+        ed25519.scalarmult_ext(P, ed25519.decodeint(sig[:32])))
+
+def _hash_to_ec(key):
+    return _mul8(ed25519.ge_fromfe_frombytes_vartime(cn_fast_hash(key)))
+
+def _mul8(P):
+    return ed25519.double(ed25519.double(ed25519.double(P)))
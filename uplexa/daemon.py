@@ -1,3 +1,6 @@
+from binascii import hexlify
+
+
 class Daemon(object):
     """uPlexa daemon.
 
@@ -41,3 +44,27 @@ class Daemon(object):
         :rtype: list of :class:`Transaction <uplexa.transaction.Transaction>`
         """
         return self._backend.mempool()
+
+    def key_images_spent(self, key_images, chunk_size=1000):
+        """
+        Checks whether the outputs of given key images have been spent. The daemon is queried
+        in chunks of `chunk_size` key images.
+
+        :param key_images: a sequence of key images, as hexadecimal strings or 32-byte values
+                (see :func:`generate_key_image <uplexa.crypto.generate_key_image>`)
+        :rtype: list of int, one for each key image: `0` if unspent, `1` if spent in
+                the blockchain, `2` if spent in a mempool transaction
+        """
+        key_images = [_key_image_hex(ki) for ki in key_images]
+        statuses = []
+        for i in range(0, len(key_images), chunk_size):
+            statuses.extend(self._backend.key_images_spent(key_images[i:i + chunk_size]))
+        return statuses
+
+
+def _key_image_hex(ki):
+    if isinstance(ki, (bytes, bytearray)):
+        if len(ki) == 32:
+            return hexlify(ki).decode()
+        return ki.decode()
+    return ki
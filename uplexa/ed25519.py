@@ -7,30 +7,43 @@ import hashlib
 import operator as _oper
 import sys as _sys
 
+from .cache import LRUCache
+
 # Set up byte handling for Python 2 or 3
 if _sys.version_info.major == 2:    # pragma: no cover
     int2byte = chr
     range = xrange
+    int_types = (int, long)
 
     def indexbytes(buf, i):
         return ord(buf[i])
 
     def intlist2bytes(l):
         return b"".join(chr(c) for c in l)
+
+    def int2le(n, size):
+        return unhexlify('%0*x' % (2 * size, n))[::-1]
+
+    def le2int(s):
+        return int(hexlify(bytes(s)[::-1]) or '0', 16)
 else:                               # pragma: no cover
     indexbytes = _oper.getitem
     intlist2bytes = bytes
     int2byte = _oper.methodcaller("to_bytes", 1, "big")
+    int_types = (int,)
+
+    def int2le(n, size):
+        return n.to_bytes(size, 'little')
+
+    def le2int(s):
+        return int.from_bytes(s, 'little')
 
 b = 256
 q = 2**255 - 19
 l = 2**252 + 27742317777372353535851937790883648493
 
 def expmod(b, e, m):
-    if e == 0: return 1
-    t = expmod(b, e//2, m)**2 % m
-    if e & 1: t = (t*b) % m
-    return t
+    return pow(b, e, m)
 
 def inv(x):
   return expmod(x, q-2, q)
@@ -57,13 +70,7 @@ Bx = xrecover(By)
 B = [Bx%q, By%q]
 
 def edwards(P, Q):
-    x1 = P[0]
-    y1 = P[1]
-    x2 = Q[0]
-    y2 = Q[1]
-    x3 = (x1*y2+x2*y1) * inv(1+d*x1*x2*y1*y2)
-    y3 = (y1*y2+x1*x2) * inv(1-d*x1*x2*y1*y2)
-    return [x3%q, y3%q]
+    return list((Point.from_affine(P) + Point.from_affine(Q)).affine())
 
 def add(P, Q):
     A = (P[1]-P[0])*(Q[1]-Q[0]) % q
@@ -74,27 +81,202 @@ def add(P, Q):
     F = D-C
     G = D+C
     H = B+A
-    return (E*F, G*H, F*G, E*H)
+    return (E*F % q, G*H % q, F*G % q, E*H % q)
+
+def double(P):
+    A = P[0]*P[0] % q
+    B = P[1]*P[1] % q
+    C = 2 * P[2]*P[2] % q
+    H = A+B
+    E = H - (P[0]+P[1])**2
+    G = A-B
+    F = C+G
+    return (E*F % q, G*H % q, F*G % q, E*H % q)
+
+ident = (0, 1, 1, 0)
 
 def add_compressed(P, Q):
-    return compress(add(decompress(P), decompress(Q)))
+    return (Point.from_affine(P) + Point.from_affine(Q)).affine()
+
+def neg(P):
+    return (-P[0] % q, P[1], P[2], -P[3] % q)
+
+def wnaf(e, w=5):
+    """Returns the width-`w` non-adjacent form of scalar `e`, least significant digit first.
+    Every non-zero digit is odd and smaller than ``2**(w-1)`` in absolute value, and is
+    followed by at least ``w-1`` zeros. The recoding may be computed once and reused for
+    multiplying many points by the same scalar, see :func:`scalarmult_wnaf`."""
+    naf = []
+    while e > 0:
+        digit = 0
+        if e & 1:
+            digit = e & ((1 << w) - 1)
+            if digit >> (w-1): digit -= 1 << w
+            e -= digit
+        naf.append(digit)
+        e >>= 1
+    return tuple(naf)
+
+def scalarmult_wnaf(P, naf):
+    """Multiplies point `P` given in extended coordinates by a scalar recoded with
+    :func:`wnaf`, using a table of the odd multiples of `P`."""
+    top = max(map(abs, naf)) if naf else 0
+    odd = [P]
+    if top > 1:
+        P2 = double(P)
+        for i in range(top // 2):
+            odd.append(add(odd[-1], P2))
+    negodd = [neg(R) for R in odd]
+    Q = ident
+    for digit in reversed(naf):
+        Q = double(Q)
+        if digit > 0: Q = add(Q, odd[digit >> 1])
+        elif digit < 0: Q = add(Q, negodd[-digit >> 1])
+    return Q
+
+def scalarmult_ext(P, e):
+    """Multiplies point `P` given in extended coordinates by scalar `e`. The result is
+    also in extended coordinates, so no field inversion takes place."""
+    return scalarmult_wnaf(P, wnaf(e))
 
 def scalarmult(P, e):
-    if e == 0: return [0, 1]
-    Q = scalarmult(P, e//2)
-    Q = edwards(Q, Q)
-    if e & 1: Q = edwards(Q, P)
+    return list((Point.from_affine(P) * e).affine())
+
+class FixedBase(object):
+    """Multiplication by a fixed point `P` (in extended coordinates).
+
+    On first use a table of ``j * 16**i * P`` is built for every 4-bit digit `j` of a
+    256-bit scalar, after which a multiplication costs at most 64 additions and no doublings.
+    """
+    windows = b//4
+
+    def __init__(self, P):
+        self.P = P
+        self._table = None
+
+    def _build(self):
+        table = []
+        R = self.P
+        for i in range(self.windows):
+            row = [ident, R]
+            for j in range(2, 16):
+                row.append(add(row[-1], R))
+            table.append(row)
+            R = add(row[-1], R)
+        self._table = table
+        return table
+
+    def mult(self, e):
+        if e >> b:
+            return scalarmult_ext(self.P, e)
+        table = self._table or self._build()
+        Q = ident
+        i = 0
+        while e:
+            if e & 15: Q = add(Q, table[i][e & 15])
+            e >>= 4
+            i += 1
+        return Q
+
+_base = FixedBase(decompress(B))
+_fixed_bases = LRUCache(64)
+
+def scalarmult_base(e):
+    """Multiplies the base point `B` by `e`, returning extended coordinates."""
+    return _base.mult(e)
+
+def register_fixed_base(s):
+    """Returns the :class:`FixedBase` for the point encoded as `s`, creating it on first call.
+    Meant for long-lived keys, like a wallet's public view key. Only the recently used
+    bases are kept."""
+    fb = _fixed_bases.get(s)
+    if fb is None:
+        fb = FixedBase(decodepoint_ext(s))
+        _fixed_bases.put(s, fb)
+    return fb
+
+_PIPPENGER_THRESHOLD = 160
+
+def multiscalarmult(pairs):
+    """Computes ``s1*P1 + s2*P2 + ...`` for a sequence of ``(scalar, point)`` pairs, with points
+    and the result in extended coordinates. The doublings are shared among all terms:
+    small inputs are interleaved (Straus), large ones are summed in buckets (Pippenger)."""
+    pairs = [(s, P) for s, P in pairs if s]
+    if not pairs:
+        return ident
+    if len(pairs) < _PIPPENGER_THRESHOLD:
+        return _straus(pairs)
+    return _pippenger(pairs)
+
+def _straus(pairs):
+    tables = []
+    for s, P in pairs:
+        row = [ident, P]
+        for j in range(2, 16):
+            row.append(add(row[-1], P))
+        tables.append(row)
+    bits = max(s.bit_length() for s, P in pairs)
+    Q = ident
+    for i in range((bits + 3)//4 - 1, -1, -1):
+        Q = double(double(double(double(Q))))
+        shift = 4 * i
+        for (s, P), row in zip(pairs, tables):
+            digit = (s >> shift) & 15
+            if digit: Q = add(Q, row[digit])
+    return Q
+
+def _pippenger(pairs):
+    n = len(pairs)
+    bits = max(s.bit_length() for s, P in pairs)
+    # choose the window minimizing the number of additions
+    c = min(range(1, 17), key=lambda c: ((bits + c - 1)//c) * (n + 2**(c+1)))
+    mask = (1 << c) - 1
+    Q = ident
+    for i in range((bits + c - 1)//c - 1, -1, -1):
+        for _ in range(c):
+            Q = double(Q)
+        shift = i * c
+        buckets = [None] * (mask + 1)
+        for s, P in pairs:
+            k = (s >> shift) & mask
+            if k: buckets[k] = P if buckets[k] is None else add(buckets[k], P)
+        running = total = ident
+        for k in range(mask, 0, -1):
+            if buckets[k] is not None: running = add(running, buckets[k])
+            if running is not ident: total = add(total, running)
+        Q = add(Q, total)
     return Q
 
 def encodeint(y):
-    bits = [(y >> i) & 1 for i in range(b)]
-    return b''.join([int2byte(sum([bits[i*8 + j] << j for j in range(8)])) for i in range(b//8)])
+    return int2le(y & (2**b - 1), b//8)
 
 def encodepoint(P):
-    x = P[0]
-    y = P[1]
-    bits = [(y >> i) & 1 for i in range(b-1)] + [x & 1]
-    return b''.join([int2byte(sum([bits[i * 8 + j] << j for j in range(8)])) for i in range(b//8)])
+    return int2le(P[1] & (2**(b-1) - 1) | (P[0] & 1) << (b-1), b//8)
+
+def encodepoint_ext(P):
+    return encodepoint(compress(P))
+
+def batch_compress(points):
+    """Converts a sequence of extended points to affine ones using a single field inversion
+    (Montgomery's simultaneous inversion) and three multiplications per point."""
+    points = list(points)
+    partial = []
+    acc = 1
+    for P in points:
+        partial.append(acc)
+        acc = acc * P[2] % q
+    acc = inv(acc)
+    res = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        P = points[i]
+        zinv = acc * partial[i] % q
+        acc = acc * P[2] % q
+        res[i] = (P[0] * zinv % q, P[1] * zinv % q)
+    return res
+
+def batch_encodepoint(points):
+    """Encodes a sequence of extended points with a single field inversion."""
+    return [encodepoint(P) for P in batch_compress(points)]
 
 def bit(h, i):
     return (indexbytes(h, i//8) >> (i%8)) & 1
@@ -105,16 +287,160 @@ def isoncurve(P):
     return (-x*x + y*y - 1 - d*x*x*y*y) % q == 0
 
 def decodeint(s):
-    return sum(2**i * bit(s, i) for i in range(0, b))
+    return le2int(s[:b//8])
 
-def decodepoint(s):
-    y = sum(2**i * bit(s, i) for i in range(0, b-1))
-    x = xrecover(y)
-    if x & 1 != bit(s, b-1): x = q - x
-    P = [x, y]
-    if not isoncurve(P): raise Exception("decoding point that is not on curve")
+def _decodepoint(s):
+    y = le2int(s)
+    sign = y >> (b-1)
+    y &= 2**(b-1) - 1
+    # x = sqrt(u / v), computed as u * v^3 * (u * v^7)^((q-5)/8) with a single exponentiation
+    u = (y*y - 1) % q
+    v = (d*y*y + 1) % q
+    v3 = v*v*v % q
+    x = u * v3 * expmod(u * v3 * v3 * v, (q-5)//8, q) % q
+    vxx = v*x*x % q
+    if vxx != u:
+        if (vxx + u) % q != 0: raise Exception("decoding point that is not on curve")
+        x = x * I % q
+    if x & 1 != sign: x = q - x
+    return (x, y, 1, x*y % q)
+
+_decoded_points = LRUCache(4096)
+
+def decodepoint_ext(s):
+    """Decodes a point into extended coordinates. Results are kept in a LRU cache keyed
+    by the encoding, as the same keys tend to be decoded over and over."""
+    s = bytes(s)
+    P = _decoded_points.get(s)
+    if P is None:
+        P = _decodepoint(s)
+        _decoded_points.put(s, P)
     return P
 
+def decodepoint(s):
+    # NOTE: y is returned as encoded, not reduced modulo q
+    return list(decodepoint_ext(s)[:2])
+
+class Point(object):
+    """A point of the curve, kept in extended coordinates.
+
+    Points support ``+``, ``-`` (also unary) and ``*`` by an integer scalar. They are
+    immutable, so the encoding is computed on first call of :meth:`to_bytes` and kept,
+    which also makes hashing cheap. Multiplications of :meth:`base` use the fixed-base table.
+    """
+    __slots__ = ('ext', '_bytes')
+
+    def __init__(self, ext):
+        self.ext = ext
+        self._bytes = None
+
+    @classmethod
+    def from_bytes(cls, s):
+        """Decodes a point, raising `Exception` if `s` is not a valid encoding."""
+        return cls(decodepoint_ext(s))
+
+    @classmethod
+    def from_affine(cls, P):
+        return cls(decompress(P))
+
+    @classmethod
+    def base(cls):
+        """Returns the base point `B`."""
+        return _base_point
+
+    def affine(self):
+        """Returns the affine coordinates ``(x, y)``, reduced modulo `q`."""
+        if self.ext[2] == 1:
+            # decoded points may keep a non-canonical y
+            return (self.ext[0] % q, self.ext[1] % q)
+        return compress(self.ext)
+
+    def to_bytes(self):
+        if self._bytes is None:
+            self._bytes = encodepoint(self.affine())
+        return self._bytes
+
+    def __add__(self, other):
+        return Point(add(self.ext, other.ext))
+
+    def __sub__(self, other):
+        return Point(add(self.ext, neg(other.ext)))
+
+    def __neg__(self):
+        return Point(neg(self.ext))
+
+    def __mul__(self, e):
+        if not isinstance(e, int_types):
+            return NotImplemented
+        if e < 0:
+            return -self * -e
+        if self is _base_point:
+            return Point(scalarmult_base(e))
+        return Point(scalarmult_ext(self.ext, e))
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if not isinstance(other, Point):
+            return NotImplemented
+        # compare projectively, without inversions
+        P, Q = self.ext, other.ext
+        return (P[0]*Q[2] - Q[0]*P[2]) % q == 0 and (P[1]*Q[2] - Q[1]*P[2]) % q == 0
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self):
+        return hash(self.to_bytes())
+
+    def __repr__(self):
+        return "Point({0})".format(hexlify(self.to_bytes()).decode())
+
+_base_point = Point(decompress(B))
+
+def _sqrt(a):
+    x = expmod(a, (q+3)//8, q)
+    if (x*x - a) % q != 0: x = x * I % q
+    return x
+
+_A = 486662
+_fffb1 = _sqrt(-2 * _A * (_A + 2) % q)
+_fffb2 = _sqrt(2 * _A * (_A + 2) % q)
+_fffb3 = _sqrt(-I * _A * (_A + 2) % q)
+_fffb4 = _sqrt(I * _A * (_A + 2) % q)
+
+def ge_fromfe_frombytes_vartime(s):
+    """Maps 32 bytes (taken as a field element) to a point of the curve, returning extended
+    coordinates. This is the Elligator-like map used by ``hash_to_ec``; the result is not
+    multiplied by the cofactor."""
+    u = le2int(s) % q
+    v = 2*u*u % q
+    w = (v + 1) % q
+    x = (w*w - _A*_A*v) % q
+    # r = sqrt(w / x), computed as w * x^3 * (w * x^7)^((q-5)/8)
+    x3 = x*x*x % q
+    r = w * x3 * expmod(w * x3 * x3 * x, (q-5)//8, q) % q
+    x = r*r*x % q
+    if (w - x) % q == 0:
+        r = r * _fffb2 * u % q
+        z = -_A * v % q
+        sign = 0
+    elif (w + x) % q == 0:
+        r = r * _fffb1 * u % q
+        z = -_A * v % q
+        sign = 0
+    else:
+        x = x * I % q
+        r = r * (_fffb4 if (w - x) % q == 0 else _fffb3) % q
+        z = -_A % q
+        sign = 1
+    if r & 1 != sign: r = q - r
+    Z = (z + w) % q
+    Y = (z - w) % q
+    X = r * Z % q
+    return (X*Z % q, Y*Z % q, Z*Z % q, X*Y % q)
+
 # These are unused but let's keep them
 #def H(m):
 #    return hashlib.sha512(m).digest()
@@ -148,9 +474,7 @@ def decodepoint(s):
 #        raise Exception("signature does not pass verification")
 
 def public_from_secret(k):
-    keyInt = decodeint(k)
-    aB = scalarmult(B, keyInt)
-    return encodepoint(aB)
+    return (Point.base() * decodeint(k)).to_bytes()
 
 def public_from_secret_hex(hk):
     return hexlify(public_from_secret(unhexlify(hk))).decode()
@@ -0,0 +1,214 @@
+"""
+Batch engine for bulk multiplications on ed25519, based on NumPy.
+
+Field elements are held as ten signed limbs of 26 and 25 bits (radix 2^25.5), like in
+the ref10 implementation. A batch of `N` elements is a ``(10, N)`` array of `int64`, so every
+field operation works on all lanes at once. Points are 4-tuples of such arrays (extended
+coordinates) and the scalar multiplications walk all lanes in lock-step through the same
+sequence of doublings and additions. The results are the same points as those computed
+by :mod:`uplexa.ed25519`.
+
+The module requires NumPy, which is an optional dependency. Importing it without NumPy
+raises `ImportError`.
+"""
+import numpy as np
+import weakref
+
+from . import ed25519
+
+_WIDTHS = np.array([26, 25] * 5, dtype=np.int64)
+_OFFSETS = [0, 26, 51, 77, 102, 128, 153, 179, 204, 230]
+_W = _WIDTHS.reshape(10, 1)
+_ROUND = (np.int64(1) << (_W - 1))
+
+CHUNK = 1024
+
+
+def _carry(h, rounds=1):
+    for _ in range(rounds):
+        c = (h + _ROUND) >> _W
+        h = h - (c << _W)
+        h[1:] += c[:-1]
+        h[0] += 19 * c[9]
+    return h
+
+def fe_add(f, g):
+    return _carry(f + g)
+
+def fe_sub(f, g):
+    return _carry(f - g)
+
+def fe_mul(f, g):
+    # h[k] = sum(f[i] * g[k-i]), where the products wrapping around 2^255 are multiplied
+    # by 19 and the products of two odd (25-bit) limbs are doubled; the rows g[k-i] for
+    # all k are a slice of the table below
+    n = g.shape[1]
+    gg = np.empty((20, n), dtype=np.int64)
+    np.multiply(g, 19, out=gg[:10])
+    gg[10:] = g
+    gd = gg.copy()
+    gd[1::2] *= 2
+    h = f[0] * gg[10:]
+    tmp = np.empty_like(h)
+    for i in range(1, 10):
+        np.multiply(f[i], (gd if i & 1 else gg)[10-i:20-i], out=tmp)
+        h += tmp
+    return _carry(h, 2)
+
+def fe_from_ints(values):
+    """Converts a sequence of integers into a ``(10, N)`` array of limbs."""
+    data = b''.join(ed25519.int2le(v % ed25519.q, 32) for v in values)
+    words = np.frombuffer(data, dtype='<u8').reshape(-1, 4).T.astype(np.uint64)
+    res = np.empty((10, words.shape[1]), dtype=np.int64)
+    for i, off in enumerate(_OFFSETS):
+        w, s = divmod(off, 64)
+        limb = words[w] >> np.uint64(s)
+        if s + _WIDTHS[i] > 64:
+            limb = limb | (words[w + 1] << np.uint64(64 - s))
+        res[i] = (limb & np.uint64((1 << int(_WIDTHS[i])) - 1)).astype(np.int64)
+    return res
+
+def fe_to_ints(h):
+    """Converts an array of limbs into a list of integers reduced modulo `q`."""
+    h = _carry(h, 2)
+    # the freeze of ref10: find out whether h >= q and subtract it
+    c = (19 * h[9] + (1 << 24)) >> 25
+    for i in range(10):
+        c = (h[i] + c) >> _WIDTHS[i]
+    h = h.copy()
+    h[0] += 19 * c
+    for i in range(9):
+        c = h[i] >> _WIDTHS[i]
+        h[i + 1] += c
+        h[i] -= c << _WIDTHS[i]
+    h[9] &= (1 << 25) - 1
+    words = np.zeros((4, h.shape[1]), dtype=np.uint64)
+    u = h.astype(np.uint64)
+    for i, off in enumerate(_OFFSETS):
+        w, s = divmod(off, 64)
+        words[w] |= u[i] << np.uint64(s)
+        if s + _WIDTHS[i] > 64:
+            words[w + 1] |= u[i] >> np.uint64(64 - s)
+    data = words.T.astype('<u8').tobytes()
+    return [ed25519.le2int(data[i:i + 32]) for i in range(0, len(data), 32)]
+
+def _const(n):
+    return fe_from_ints([n])
+
+_D2 = _const(2 * ed25519.d)
+
+
+def point_add(P, Q):
+    A = fe_mul(fe_sub(P[1], P[0]), fe_sub(Q[1], Q[0]))
+    B = fe_mul(fe_add(P[1], P[0]), fe_add(Q[1], Q[0]))
+    C = fe_mul(fe_mul(P[3], Q[3]), _D2)
+    D = fe_mul(P[2], Q[2])
+    D = fe_add(D, D)
+    E = fe_sub(B, A)
+    F = fe_sub(D, C)
+    G = fe_add(D, C)
+    H = fe_add(B, A)
+    return (fe_mul(E, F), fe_mul(G, H), fe_mul(F, G), fe_mul(E, H))
+
+def point_double(P):
+    A = fe_mul(P[0], P[0])
+    B = fe_mul(P[1], P[1])
+    C = fe_mul(P[2], P[2])
+    C = fe_add(C, C)
+    H = fe_add(A, B)
+    S = fe_add(P[0], P[1])
+    E = fe_sub(H, fe_mul(S, S))
+    G = fe_sub(A, B)
+    F = fe_add(C, G)
+    return (fe_mul(E, F), fe_mul(G, H), fe_mul(F, G), fe_mul(E, H))
+
+def points_from_ext(points):
+    """Converts a sequence of points in extended coordinates into a batch."""
+    points = list(points)
+    return tuple(fe_from_ints([P[c] for P in points]) for c in range(4))
+
+def points_to_ext(P):
+    """Converts a batch of points into a list of extended coordinate tuples."""
+    return list(zip(*(fe_to_ints(c) for c in P)))
+
+def _select(table, digits):
+    # table is an array of shape (16, 4, 10, N) or (16, 4, 10, 1)
+    if table.shape[3] == 1:
+        sel = table[digits, :, :, 0]
+    else:
+        sel = table[digits, :, :, np.arange(len(digits))]
+    sel = sel.transpose(1, 2, 0)
+    return (sel[0], sel[1], sel[2], sel[3])
+
+def _digits(scalars, bits):
+    # 4-bit windows of all scalars, most significant first, shape (windows, N)
+    windows = (bits + 3) // 4
+    data = b''.join(ed25519.int2le(e, windows // 2 + 1) for e in scalars)
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(len(scalars), -1)
+    nibbles = np.empty((len(scalars), 2 * raw.shape[1]), dtype=np.intp)
+    nibbles[:, 0::2] = raw & 15
+    nibbles[:, 1::2] = raw >> 4
+    return nibbles[:, :windows][:, ::-1].T
+
+_fixed_tables = weakref.WeakKeyDictionary()
+
+def _fixed_base_table(fixed_base):
+    try:
+        return _fixed_tables[fixed_base]
+    except KeyError:
+        pass
+    table = fixed_base._table or fixed_base._build()
+    res = np.stack([
+        np.stack([np.stack([fe_from_ints([R[c]])[:, 0] for c in range(4)]) for R in row])
+        for row in table])[..., None]
+    _fixed_tables[fixed_base] = res
+    return res
+
+def _scalarmult_chunk(points, scalars):
+    scalars = list(scalars)
+    P = points_from_ext(points)
+    n = len(scalars)
+    ident = tuple(fe_from_ints([c] * n) for c in ed25519.ident)
+    row = [ident, P]
+    for j in range(2, 16):
+        row.append(point_add(row[-1], P))
+    table = np.stack([np.stack(R) for R in row])
+    bits = max(e.bit_length() for e in scalars) or 1
+    Q = ident
+    for digits in _digits(scalars, bits):
+        Q = point_double(point_double(point_double(point_double(Q))))
+        Q = point_add(Q, _select(table, digits))
+    return points_to_ext(Q)
+
+def _fixed_base_chunk(fixed_base, scalars):
+    scalars = list(scalars)
+    table = _fixed_base_table(fixed_base)
+    n = len(scalars)
+    Q = tuple(fe_from_ints([c] * n) for c in ed25519.ident)
+    digits = _digits(scalars, ed25519.b)[::-1]
+    for i, dg in enumerate(digits):
+        Q = point_add(Q, _select(table[i], dg))
+    return points_to_ext(Q)
+
+def _chunked(func, *seqs):
+    seqs = [list(s) for s in seqs]
+    res = []
+    for i in range(0, len(seqs[0]), CHUNK):
+        res.extend(func(*(s[i:i + CHUNK] for s in seqs)))
+    return res
+
+def batch_scalarmult(points, scalars):
+    """Multiplies each point (in extended coordinates) by the corresponding non-negative
+    scalar. Returns a list of points in extended coordinates."""
+    return _chunked(_scalarmult_chunk, points, scalars)
+
+def batch_scalarmult_base(scalars):
+    """Multiplies the base point by each of the non-negative scalars, which must be smaller
+    than ``2**256``. Returns a list of points in extended coordinates."""
+    return batch_fixed_base_mult(ed25519._base, scalars)
+
+def batch_fixed_base_mult(fixed_base, scalars):
+    """Multiplies the point of a :class:`FixedBase <uplexa.ed25519.FixedBase>` by each of
+    the non-negative scalars, which must be smaller than ``2**256``. The table of the fixed
+    base is used, so no doublings take place."""
+    return _chunked(lambda chunk: _fixed_base_chunk(fixed_base, chunk), scalars)
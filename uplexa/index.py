@@ -0,0 +1,153 @@
+"""
+Persistent reverse index of subaddresses.
+
+The index maps public spend keys and full address bytes of subaddresses to their
+`(major, minor)` indexes. It's kept in an SQLite database, so lookups take constant time
+and the table doesn't have to be derived again on every start of a service.
+
+The index is filled by a :class:`Wallet <uplexa.wallet.Wallet>` created with it, as the
+wallet derives addresses:
+
+.. code-block:: python
+
+    index = SubaddressIndex('wallet.idx')
+    wallet = Wallet(OfflineWallet(address, view_key=view_key), index=index)
+    wallet.get_addresses(0, range(10000))
+    index[spend_key]    # -> (0, 1234)
+
+It can also be passed to :class:`OutputScanner <uplexa.scanner.OutputScanner>` in place of
+the subaddress table.
+"""
+from binascii import unhexlify
+import sqlite3
+
+from . import base58
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subaddresses (
+    spend_key BLOB PRIMARY KEY,
+    address BLOB NOT NULL UNIQUE,
+    major INTEGER NOT NULL,
+    minor INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subaddresses_index ON subaddresses (major, minor);
+"""
+
+
+class SubaddressIndex(object):
+    """
+    A mapping of public spend keys (32-byte strings) to `(major, minor)` index pairs, stored
+    in an SQLite database. It belongs to a single wallet, see :meth:`attach`.
+
+    The object may be pickled, e.g. to be sent to worker processes, and is then reopened
+    from the same path. A transient index can't be pickled.
+
+    :param path: the path of the database file, or ``':memory:'`` for a transient index
+    """
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def __reduce__(self):
+        if self.path == ':memory:':
+            raise TypeError("Transient subaddress index cannot be pickled, use a file instead")
+        return (type(self), (self.path,))
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def address(self):
+        """The master address of the wallet the index belongs to, or `None` if it's empty."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'address'").fetchone()
+        return row[0] if row else None
+
+    def attach(self, address):
+        """
+        Binds the index to the wallet of master `address`.
+
+        :raises: `ValueError` if the index belongs to another wallet
+        """
+        current = self.address
+        if current is None:
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO meta (key, value) VALUES ('address', ?)", (str(address),))
+        elif current != str(address):
+            raise ValueError("Subaddress index {} belongs to wallet {}, not {}".format(
+                self.path, current, address))
+
+    def add(self, entries):
+        """
+        Stores subaddresses, given as an iterable of `(spend_key, address_bytes, major, minor)`
+        tuples. The `address_bytes` are the decoded address, including the checksum.
+        Entries already present are left intact.
+        """
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO subaddresses (spend_key, address, major, minor) "
+                "VALUES (?, ?, ?, ?)",
+                ((sqlite3.Binary(sk), sqlite3.Binary(addr), major, minor)
+                 for sk, addr, major, minor in entries))
+
+    def get(self, spend_key, default=None):
+        """
+        Returns the `(major, minor)` pair of the subaddress with public spend key `spend_key`,
+        given as bytes or hexadecimal string, or `default` if it's unknown.
+        """
+        if len(spend_key) == 64:
+            spend_key = unhexlify(spend_key)
+        row = self._db.execute(
+            "SELECT major, minor FROM subaddresses WHERE spend_key = ?",
+            (sqlite3.Binary(spend_key),)).fetchone()
+        return tuple(row) if row else default
+
+    def get_address(self, address, default=None):
+        """
+        Returns the `(major, minor)` pair of `address`, given as an
+        :class:`Address <uplexa.address.Address>`, base58 string or decoded bytes,
+        or `default` if it's unknown.
+        """
+        if not (isinstance(address, (bytes, bytearray)) and len(address) == 69):
+            address = base58.decode_bytes(str(address))
+        row = self._db.execute(
+            "SELECT major, minor FROM subaddresses WHERE address = ?",
+            (sqlite3.Binary(bytes(address)),)).fetchone()
+        return tuple(row) if row else default
+
+    def max_minor(self, major):
+        """
+        Returns the highest address index stored for account `major`, or `None` if there's
+        none.
+        """
+        return self._db.execute(
+            "SELECT MAX(minor) FROM subaddresses WHERE major = ?", (major,)).fetchone()[0]
+
+    def count(self, major):
+        """Returns the number of addresses stored for account `major`."""
+        return self._db.execute(
+            "SELECT COUNT(*) FROM subaddresses WHERE major = ?", (major,)).fetchone()[0]
+
+    def __getitem__(self, spend_key):
+        res = self.get(spend_key)
+        if res is None:
+            raise KeyError(spend_key)
+        return res
+
+    def __contains__(self, spend_key):
+        return self.get(spend_key) is not None
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM subaddresses").fetchone()[0]
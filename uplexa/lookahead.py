@@ -0,0 +1,119 @@
+"""
+Sliding lookahead of precomputed subaddresses.
+
+Like the reference wallet, the lookahead keeps a number of subaddresses derived past the
+highest used address index of each account, so that incoming outputs can be attributed
+without asking the wallet. When an address close to the edge gets used, only the missing
+addresses are derived.
+"""
+from binascii import unhexlify
+
+
+class SubaddressLookahead(object):
+    """
+    A mapping of public spend keys (32-byte strings) to `(major, minor)` index pairs, covering
+    `size` addresses past the highest used address index of every known account.
+
+    A successful lookup marks the address as used and extends the window, so the object
+    may be given to :class:`OutputScanner <uplexa.scanner.OutputScanner>` in place of the
+    subaddress table. Scanning in worker processes works on copies, though; the subaddresses
+    found there should be passed to :meth:`mark_used`.
+
+    If the wallet has a :class:`SubaddressIndex <uplexa.index.SubaddressIndex>`, it serves
+    as the table and the addresses stored there by previous runs aren't derived again.
+
+    :param wallet: a :class:`Wallet <uplexa.wallet.Wallet>`
+    :param size: the number of addresses kept ahead of the highest used one
+    """
+    def __init__(self, wallet, size=200):
+        self.wallet = wallet
+        self.size = size
+        self._index = wallet.index
+        self._table = {} if self._index is None else None
+        self._used = {}
+        self._next = {}
+        self.sync()
+
+    def table(self):
+        """
+        Returns the current table without the lookahead logic: the wallet's
+        :class:`SubaddressIndex <uplexa.index.SubaddressIndex>` or a copy of the `dict`.
+        """
+        if self._table is None:
+            return self._index
+        return dict(self._table)
+
+    def sync(self):
+        """
+        Marks the addresses existing in the wallet as used, see :meth:`Account.addresses()
+        <uplexa.account.Account.addresses>`. This is called on initialization and should be
+        repeated when new addresses or accounts have been created elsewhere.
+        """
+        for acc in self.wallet.accounts:
+            self.mark_used(acc.index, len(acc.addresses()) - 1)
+
+    def mark_used(self, major, minor):
+        """
+        Marks address `(major, minor)` as used and extends the window of account `major`
+        if needed.
+        """
+        if minor > self._used.get(major, -1):
+            self._used[major] = minor
+        self._extend(major)
+
+    def used(self, major):
+        """Returns the highest used address index of account `major`, or `-1`."""
+        return self._used.get(major, -1)
+
+    def window(self, major):
+        """Returns the `range` of address indexes of account `major` in the table."""
+        return range(self._next.get(major, 0))
+
+    def _extend(self, major):
+        start = self._next.get(major)
+        if start is None:
+            start = self._stored(major)
+        stop = self._used[major] + 1 + self.size
+        if start < stop:
+            for minor, addr in enumerate(self.wallet.iter_addresses(major, range(start, stop))):
+                if self._table is not None:
+                    self._table[unhexlify(addr.spend_key())] = (major, start + minor)
+        self._next[major] = max(start, stop)
+
+    def _stored(self, major):
+        # the number of addresses of account `major` already in the index,
+        # if they form a contiguous range starting at 0
+        if self._index is None:
+            return 0
+        top = self._index.max_minor(major)
+        if top is None or self._index.count(major) != top + 1:
+            return 0
+        return top + 1
+
+    def get(self, spend_key, default=None):
+        """
+        Returns the `(major, minor)` pair of the subaddress with public spend key `spend_key`
+        or `default` if it's not in the table. A found address is marked as used.
+        """
+        if self._table is None:
+            res = self._index.get(spend_key)
+        else:
+            res = self._table.get(spend_key)
+        if res is None:
+            return default
+        self.mark_used(*res)
+        return res
+
+    def __getitem__(self, spend_key):
+        res = self.get(spend_key)
+        if res is None:
+            raise KeyError(spend_key)
+        return res
+
+    def __contains__(self, spend_key):
+        if self._table is None:
+            return spend_key in self._index
+        return spend_key in self._table
+
+    def __len__(self):
+        return sum(self._next.values())
@@ -0,0 +1,24 @@
+import itertools
+import multiprocessing
+
+
+def chunks(iterable, size):
+    """
+    Splits `iterable`, which may be unbounded, into lists of at most `size` items.
+    """
+    iterable = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterable, size))
+        if not chunk:
+            return
+        yield chunk
+
+def process_pool(processes=None):
+    """
+    Returns a :class:`ProcessPoolExecutor` of `processes` workers, defaulting to the number
+    of CPUs.
+
+    On Python 2 this requires the `futures` backport.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=processes or multiprocessing.cpu_count())
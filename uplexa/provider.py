@@ -0,0 +1,238 @@
+"""
+Providers of the elliptic curve and hashing primitives.
+
+A provider covers point decoding and encoding, point addition, multiplication of points
+by scalars (also with a fixed base), scalar arithmetic modulo `l` and Keccak-256.
+Scalars and point encodings are 32-byte strings. Points are opaque objects, obtained from
+:meth:`decodepoint <PythonProvider.decodepoint>` or the arithmetic methods, and may be
+passed only to the provider which made them.
+
+:class:`PythonProvider` is the pure Python default. If PyNaCl is installed,
+:class:`NaClProvider` is selected at runtime instead, see :func:`get_provider`.
+"""
+from binascii import hexlify
+from sha3 import keccak_256
+
+from . import ed25519
+from . import scalar
+try:
+    from . import ed25519_numpy
+except ImportError:
+    ed25519_numpy = None
+
+_NUMPY_THRESHOLD = 64
+
+
+class PythonProvider(object):
+    """
+    The pure Python provider, built on :mod:`uplexa.ed25519`. Points are tuples of
+    extended coordinates.
+    """
+    name = 'python'
+
+    def keccak_256(self, data):
+        return keccak_256(data).digest()
+
+    def decodepoint(self, s):
+        """
+        Decodes a point.
+
+        :raises: `ValueError` if `s` is not a valid point
+        """
+        try:
+            return ed25519.decodepoint_ext(s)
+        except Exception:
+            raise ValueError("Invalid point {0}".format(hexlify(s).decode()))
+
+    def encodepoint(self, P):
+        return ed25519.encodepoint_ext(P)
+
+    def batch_encodepoint(self, points):
+        return ed25519.batch_encodepoint(points)
+
+    def point_add(self, P, Q):
+        return ed25519.add(P, Q)
+
+    def point_sub(self, P, Q):
+        return ed25519.add(P, ed25519.neg(Q))
+
+    def fixed_base(self, P):
+        """
+        Returns the form of point `P` best suited for repeated multiplication with
+        :meth:`scalarmult`. Meant for long-lived keys; the caller keeps the result, whose
+        tables are freed along with it.
+        """
+        return ed25519.FixedBase(P)
+
+    def scalarmult(self, P, s):
+        e = ed25519.decodeint(s)
+        if isinstance(P, ed25519.FixedBase):
+            return P.mult(e)
+        return ed25519.scalarmult_ext(P, e)
+
+    def scalarmult_base(self, s):
+        return ed25519.scalarmult_base(ed25519.decodeint(s))
+
+    def batch_scalarmult(self, P, scalars):
+        """
+        Multiplies point `P` (or its fixed-base form) by each of the scalars. Large batches
+        are computed by the NumPy engine, if NumPy is installed.
+        """
+        scalars = list(scalars)
+        if ed25519_numpy is None or len(scalars) < _NUMPY_THRESHOLD:
+            return [self.scalarmult(P, s) for s in scalars]
+        es = [ed25519.decodeint(s) for s in scalars]
+        if isinstance(P, ed25519.FixedBase):
+            return ed25519_numpy.batch_fixed_base_mult(P, es)
+        return ed25519_numpy.batch_scalarmult([P] * len(es), es)
+
+    def batch_scalarmult_base(self, scalars):
+        """Multiplies the base point by each of the scalars, see :meth:`batch_scalarmult`."""
+        scalars = list(scalars)
+        if ed25519_numpy is None or len(scalars) < _NUMPY_THRESHOLD:
+            return [self.scalarmult_base(s) for s in scalars]
+        return ed25519_numpy.batch_scalarmult_base([ed25519.decodeint(s) for s in scalars])
+
+    def public_from_secret(self, s):
+        """Returns the encoded public key of secret key `s`."""
+        return self.encodepoint(self.scalarmult_base(s))
+
+    def sc_reduce(self, s):
+        return scalar.sc_reduce(s)
+
+    def sc_reduce32(self, s):
+        return scalar.sc_reduce32(s)
+
+    def sc_add(self, a, b):
+        return scalar.sc_add(a, b)
+
+    def sc_sub(self, a, b):
+        return scalar.sc_sub(a, b)
+
+    def sc_mul(self, a, b):
+        return scalar.sc_mul(a, b)
+
+
+class NaClProvider(PythonProvider):
+    """
+    The provider using libsodium through PyNaCl. Points are kept as their encodings.
+    Keccak-256 is not part of libsodium and is inherited from :class:`PythonProvider`.
+
+    libsodium refuses points of small order and the neutral element; such operations
+    are passed to the pure Python code, so both providers give the same results.
+
+    :raises: `ImportError` if PyNaCl is missing or built without the ed25519 functions
+    """
+    name = 'nacl'
+
+    def __init__(self):
+        from nacl import bindings, exceptions
+        if not (bindings.has_crypto_core_ed25519 and bindings.has_crypto_scalarmult_ed25519):
+            raise ImportError("PyNaCl is built without the ed25519 primitives")
+        self._nacl = bindings
+        self._error = exceptions.RuntimeError
+
+    def decodepoint(self, s):
+        s = bytes(s)
+        if len(s) != 32 or not self._nacl.crypto_core_ed25519_is_valid_point(s):
+            # libsodium rejects points outside of the prime order subgroup
+            super(NaClProvider, self).decodepoint(s)
+        return s
+
+    def encodepoint(self, P):
+        return P
+
+    def batch_encodepoint(self, points):
+        return list(points)
+
+    def point_add(self, P, Q):
+        try:
+            return self._nacl.crypto_core_ed25519_add(P, Q)
+        except self._error:
+            return self._python(PythonProvider.point_add, P, Q)
+
+    def point_sub(self, P, Q):
+        try:
+            return self._nacl.crypto_core_ed25519_sub(P, Q)
+        except self._error:
+            return self._python(PythonProvider.point_sub, P, Q)
+
+    def fixed_base(self, P):
+        return P
+
+    def batch_scalarmult(self, P, scalars):
+        return [self.scalarmult(P, s) for s in scalars]
+
+    def batch_scalarmult_base(self, scalars):
+        return [self.scalarmult_base(s) for s in scalars]
+
+    def scalarmult(self, P, s):
+        # libsodium ignores bit 255 of the scalar; reducing it would change the result
+        # for points with a small order component, so such scalars go to Python
+        if not bytearray(s)[31] & 0x80:
+            try:
+                return self._nacl.crypto_scalarmult_ed25519_noclamp(bytes(s), P)
+            except self._error:
+                pass
+        return PythonProvider.encodepoint(
+            self, PythonProvider.scalarmult(self, PythonProvider.decodepoint(self, P), s))
+
+    def scalarmult_base(self, s):
+        # the base point is of prime order, so reducing the scalar doesn't change the result
+        # and keeps bit 255, which libsodium would ignore
+        try:
+            return self._nacl.crypto_scalarmult_ed25519_base_noclamp(self.sc_reduce32(s))
+        except self._error:
+            return PythonProvider.encodepoint(self, PythonProvider.scalarmult_base(self, s))
+
+    def sc_reduce(self, s):
+        if len(s) != 64:
+            raise ValueError("Wide scalar must be 64 bytes long, is {0}".format(len(s)))
+        return self._nacl.crypto_core_ed25519_scalar_reduce(bytes(s))
+
+    def sc_reduce32(self, s):
+        if len(s) != 32:
+            raise ValueError("Scalar must be 32 bytes long, is {0}".format(len(s)))
+        return self._nacl.crypto_core_ed25519_scalar_reduce(bytes(s) + b'\0' * 32)
+
+    def sc_add(self, a, b):
+        return self._nacl.crypto_core_ed25519_scalar_add(bytes(a), bytes(b))
+
+    def sc_sub(self, a, b):
+        return self._nacl.crypto_core_ed25519_scalar_sub(bytes(a), bytes(b))
+
+    def sc_mul(self, a, b):
+        return self._nacl.crypto_core_ed25519_scalar_mul(bytes(a), bytes(b))
+
+    def _python(self, method, *points):
+        return PythonProvider.encodepoint(
+            self, method(self, *(PythonProvider.decodepoint(self, P) for P in points)))
+
+
+PROVIDERS = (NaClProvider, PythonProvider)
+# NOTE: in order of preference
+
+_provider = None
+
+def available_providers():
+    """Returns instances of all providers which can run in this environment."""
+    res = []
+    for cls in PROVIDERS:
+        try:
+            res.append(cls())
+        except ImportError:
+            pass
+    return res
+
+def get_provider():
+    """Returns the provider in use, picking the first available one from :data:`PROVIDERS`
+    on first call."""
+    global _provider
+    if _provider is None:
+        _provider = available_providers()[0]
+    return _provider
+
+def set_provider(provider):
+    """Sets the provider to be used, e.g. ``set_provider(PythonProvider())``."""
+    global _provider
+    _provider = provider
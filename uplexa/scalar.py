@@ -0,0 +1,64 @@
+"""
+Arithmetic on scalars modulo the order `l` of the ed25519 base point.
+
+Scalars are 32-byte little-endian strings, as used for private keys. The functions accept
+`bytes` or `bytearray` and return `bytes`. The ``batch_`` variants apply the operation
+to sequences of arguments.
+"""
+from .ed25519 import l, le2int as _int, int2le
+
+
+def _bytes(n):
+    return int2le(n % l, 32)
+
+
+def sc_reduce(s):
+    """Reduces a 64-byte (wide) scalar modulo `l`."""
+    if len(s) != 64:
+        raise ValueError("Wide scalar must be 64 bytes long, is {0}".format(len(s)))
+    return _bytes(_int(s))
+
+def sc_reduce32(s):
+    """Reduces a 32-byte scalar modulo `l`."""
+    if len(s) != 32:
+        raise ValueError("Scalar must be 32 bytes long, is {0}".format(len(s)))
+    return _bytes(_int(s))
+
+def sc_check(s):
+    """Returns `True` if the 32-byte scalar is reduced modulo `l`."""
+    return len(s) == 32 and _int(s) < l
+
+def sc_add(a, b):
+    """Returns ``a + b``."""
+    return _bytes(_int(a) + _int(b))
+
+def sc_sub(a, b):
+    """Returns ``a - b``."""
+    return _bytes(_int(a) - _int(b))
+
+def sc_mul(a, b):
+    """Returns ``a * b``."""
+    return _bytes(_int(a) * _int(b))
+
+def sc_muladd(a, b, c):
+    """Returns ``a * b + c``."""
+    return _bytes(_int(a) * _int(b) + _int(c))
+
+
+def batch_sc_reduce(ss):
+    return [sc_reduce(s) for s in ss]
+
+def batch_sc_reduce32(ss):
+    return [sc_reduce32(s) for s in ss]
+
+def batch_sc_add(aa, bb):
+    return [_bytes(_int(a) + _int(b)) for a, b in zip(aa, bb)]
+
+def batch_sc_sub(aa, bb):
+    return [_bytes(_int(a) - _int(b)) for a, b in zip(aa, bb)]
+
+def batch_sc_mul(aa, bb):
+    return [_bytes(_int(a) * _int(b)) for a, b in zip(aa, bb)]
+
+def batch_sc_muladd(aa, bb, cc):
+    return [_bytes(_int(a) * _int(b) + _int(c)) for a, b, c in zip(aa, bb, cc)]
@@ -0,0 +1,282 @@
+"""
+Local detection of incoming outputs using the private view key.
+
+The scanner works on transactions parsed from the daemon's JSON representation (as returned
+by ``get_transactions`` with ``decode_as_json``) and doesn't need a wallet RPC process.
+"""
+from binascii import hexlify, unhexlify
+import itertools
+import struct
+import sys
+
+from . import crypto
+from . import ed25519
+from . import parallel
+from .index import SubaddressIndex
+from .lookahead import SubaddressLookahead
+from .numbers import from_atomic, PaymentID
+
+if sys.version_info < (3,): # pragma: no cover
+    _str_types = (str, bytes, unicode)
+else:                       # pragma: no cover
+    _str_types = (str, bytes)
+
+TX_EXTRA_PUBKEY = 0x01
+TX_EXTRA_NONCE = 0x02
+TX_EXTRA_MERGE_MINING = 0x03
+TX_EXTRA_ADDITIONAL_PUBKEYS = 0x04
+TX_EXTRA_MYSTERIOUS_MINERGATE = 0xde
+
+TX_EXTRA_NONCE_PAYMENT_ID = 0x00
+TX_EXTRA_NONCE_ENCRYPTED_PAYMENT_ID = 0x01
+
+RCT_TYPE_NULL = 0
+RCT_TYPE_BULLETPROOF2 = 4
+
+
+def _xor(data, mask):
+    return bytes(bytearray(a ^ b for a, b in zip(bytearray(data), bytearray(mask))))
+
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return n, pos
+        shift += 7
+
+
+def parse_extra(extra):
+    """
+    Parses transaction `extra` field, given as bytes or a list of integers.
+
+    Returns a dict with `pubkeys` and `additional_pubkeys` lists (of 32-byte strings), as well
+    as `payment_id` and `encrypted_payment_id` (bytes or `None`). Like in the reference wallet,
+    parsing stops at the first unknown or malformed field and the data found so far is kept.
+    """
+    extra = bytearray(extra)
+    res = {'pubkeys': [], 'additional_pubkeys': [], 'payment_id': None, 'encrypted_payment_id': None}
+    pos = 0
+    try:
+        while pos < len(extra):
+            tag = extra[pos]
+            pos += 1
+            if tag == TX_EXTRA_PUBKEY:
+                if pos + 32 > len(extra):
+                    break
+                res['pubkeys'].append(bytes(extra[pos:pos + 32]))
+                pos += 32
+            elif tag == TX_EXTRA_ADDITIONAL_PUBKEYS:
+                count, pos = _read_varint(extra, pos)
+                if pos + 32 * count > len(extra):
+                    break
+                for i in range(count):
+                    res['additional_pubkeys'].append(bytes(extra[pos:pos + 32]))
+                    pos += 32
+            elif tag in (TX_EXTRA_NONCE, TX_EXTRA_MERGE_MINING, TX_EXTRA_MYSTERIOUS_MINERGATE):
+                size, pos = _read_varint(extra, pos)
+                if pos + size > len(extra):
+                    break
+                data = extra[pos:pos + size]
+                pos += size
+                if tag == TX_EXTRA_NONCE and data:
+                    if data[0] == TX_EXTRA_NONCE_PAYMENT_ID and len(data) == 33:
+                        res['payment_id'] = bytes(data[1:])
+                    elif data[0] == TX_EXTRA_NONCE_ENCRYPTED_PAYMENT_ID and len(data) == 9:
+                        res['encrypted_payment_id'] = bytes(data[1:])
+            else:
+                # padding or unknown tag
+                break
+    except IndexError:
+        pass
+    return res
+
+
+class ScannedOutput(object):
+    """
+    An output found to belong to the wallet.
+
+    This class is not intended to be turned into objects by the user,
+    it is returned by :class:`OutputScanner`.
+    """
+    index = None
+    key = None
+    amount = None
+    subaddress = None
+    payment_id = None
+
+    def __init__(self, **kwargs):
+        self.index = kwargs.pop('index', self.index)
+        self.key = kwargs.pop('key', self.key)
+        self.amount = kwargs.pop('amount', self.amount)
+        self.subaddress = kwargs.pop('subaddress', self.subaddress)
+        self.payment_id = kwargs.pop('payment_id', self.payment_id)
+        if len(kwargs):
+            raise ValueError("Excessive arguments for {}: {}".format(type(self), kwargs))
+
+    def __repr__(self):
+        return "{} #{} {} to {}/{}".format(
+            self.key, self.index, self.amount, *self.subaddress)
+
+
+class OutputScanner(object):
+    """
+    Finds outputs that belong to a wallet, given its private view key and a table of
+    public spend keys of its (sub)addresses.
+
+    Outputs sent to subaddresses are recognized also when the transaction carries additional
+    public keys. Amounts are decoded from RingCT data and encrypted short payment IDs
+    are decrypted.
+
+    :param view_key: the private view key, as hexadecimal string or bytes
+    :param subaddresses: a mapping of public spend keys (32-byte strings) to
+                `(major, minor)` index pairs, or a
+                :class:`SubaddressIndex <uplexa.index.SubaddressIndex>` or
+                :class:`SubaddressLookahead <uplexa.lookahead.SubaddressLookahead>`,
+                which are used in place
+    """
+    def __init__(self, view_key, subaddresses):
+        if isinstance(view_key, _str_types) and len(view_key) == 64:
+            view_key = unhexlify(view_key)
+        self.view_key = bytes(view_key)
+        if isinstance(subaddresses, (SubaddressIndex, SubaddressLookahead)):
+            self.subaddresses = subaddresses
+        else:
+            self.subaddresses = dict(subaddresses)
+        self._naf = ed25519.wnaf(ed25519.decodeint(self.view_key))
+
+    def __getstate__(self):
+        # worker processes get the bare table of a lookahead, which can't extend it anyway
+        state = dict(self.__dict__)
+        if isinstance(self.subaddresses, SubaddressLookahead):
+            state['subaddresses'] = self.subaddresses.table()
+        return state
+
+    @classmethod
+    def from_wallet(cls, wallet, majors=(0,), minors=range(200)):
+        """
+        Creates a scanner for a :class:`Wallet <uplexa.wallet.Wallet>`, deriving the
+        subaddress table for all combinations of given account and address indexes.
+        The wallet may run on the :class:`OfflineWallet <uplexa.backends.offline.OfflineWallet>`
+        backend, only the address and private view key are used.
+        """
+        minors = list(minors)
+        table = {}
+        for major in majors:
+            for minor, addr in enumerate(wallet.get_addresses(major, minors)):
+                table[unhexlify(addr.spend_key())] = (major, minors[minor])
+        return cls(wallet.key_snapshot().view_key, table)
+
+    def derivation(self, pubkey):
+        """Returns the key derivation of a transaction public key and the private view key.
+
+        :raises: `ValueError` if the public key is not a valid point
+        """
+        try:
+            R = ed25519.decodepoint_ext(pubkey)
+        except Exception:
+            raise ValueError("Invalid public key {0}".format(hexlify(pubkey).decode()))
+        P = ed25519.scalarmult_wnaf(R, self._naf)
+        return ed25519.encodepoint_ext(ed25519.double(ed25519.double(ed25519.double(P))))
+
+    def scan(self, tx):
+        """
+        Scans a single transaction, given as a dict parsed from the daemon's JSON.
+
+        :rtype: list of :class:`ScannedOutput`
+        """
+        extra = parse_extra(tx.get('extra', []))
+        derivations = []
+        for pubkey in extra['pubkeys']:
+            try:
+                derivations.append(self.derivation(pubkey))
+            except ValueError:
+                pass
+        additional = []
+        for pubkey in extra['additional_pubkeys']:
+            try:
+                additional.append(self.derivation(pubkey))
+            except ValueError:
+                additional.append(None)
+        rct = tx.get('rct_signatures', {})
+        rct_type = rct.get('type', RCT_TYPE_NULL) if tx.get('version', 1) > 1 else RCT_TYPE_NULL
+        found = []
+        for idx, vout in enumerate(tx.get('vout', [])):
+            target = vout['target']
+            view_tag = None
+            if 'tagged_key' in target:
+                view_tag = unhexlify(target['tagged_key']['view_tag'])
+                key = target['tagged_key']['key']
+            else:
+                key = target['key']
+            out_key = unhexlify(key)
+            candidates = list(derivations)
+            if idx < len(additional) and additional[idx] is not None:
+                candidates.append(additional[idx])
+            for derivation in candidates:
+                if view_tag is not None and view_tag != crypto.cn_fast_hash(
+                        b'view_tag' + derivation + crypto.encode_varint(idx))[:1]:
+                    continue
+                try:
+                    spend_key = crypto.derive_subaddress_public_key(out_key, derivation, idx)
+                except Exception:
+                    # not a valid point
+                    break
+                if spend_key not in self.subaddresses:
+                    continue
+                found.append(ScannedOutput(
+                    index=idx,
+                    key=key,
+                    amount=self._amount(vout, rct, rct_type, derivation, idx),
+                    subaddress=self.subaddresses[spend_key],
+                    payment_id=self._payment_id(extra, derivations)))
+                break
+        return found
+
+    def _amount(self, vout, rct, rct_type, derivation, idx):
+        if rct_type == RCT_TYPE_NULL:
+            return from_atomic(vout['amount'])
+        secret = crypto.derivation_to_scalar(derivation, idx)
+        ecdh = rct['ecdhInfo'][idx]
+        if rct_type >= RCT_TYPE_BULLETPROOF2:
+            amount = _xor(unhexlify(ecdh['amount'])[:8], crypto.cn_fast_hash(b'amount' + secret))
+            return from_atomic(struct.unpack('<Q', amount)[0])
+        amount = ed25519.decodeint(unhexlify(ecdh['amount'])) \
+            - ed25519.decodeint(crypto.hash_to_scalar(crypto.hash_to_scalar(secret)))
+        return from_atomic((amount % ed25519.l) & 0xffffffffffffffff)
+
+    def _payment_id(self, extra, derivations):
+        if extra['payment_id'] is not None:
+            return PaymentID(hexlify(extra['payment_id']).decode())
+        if extra['encrypted_payment_id'] is None or not derivations:
+            return None
+        return PaymentID(hexlify(_xor(
+            extra['encrypted_payment_id'],
+            crypto.cn_fast_hash(derivations[0] + b'\x8d'))).decode())
+
+    def scan_many(self, txs, processes=None, chunksize=16):
+        """
+        Scans a sequence of transactions across a pool of worker processes, yielding a list of
+        :class:`ScannedOutput` for each transaction, in order.
+
+        :param txs: iterable of transactions, as for :meth:`scan`
+        :param processes: the number of worker processes, defaults to the number of CPUs;
+                    `1` scans in the current process
+        :param chunksize: the number of transactions sent to a worker at once
+        """
+        if processes == 1:
+            for tx in txs:
+                yield self.scan(tx)
+            return
+        with parallel.process_pool(processes) as pool:
+            for outs in pool.map(
+                    _scan_in_worker, parallel.chunks(txs, chunksize), itertools.repeat(self)):
+                for res in outs:
+                    yield res
+
+
+def _scan_in_worker(txs, scanner):
+    return [scanner.scan(tx) for tx in txs]
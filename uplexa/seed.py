@@ -36,12 +36,10 @@
 #   + optimization
 
 from uplexa import wordlists
-from uplexa import ed25519
-from uplexa import base58
-from uplexa.address import address
+from uplexa import provider
+from uplexa.address import Address
 from binascii import hexlify, unhexlify
 from os import urandom
-from sha3 import keccak_256
 
 class Seed(object):
     """Creates a seed object either from local system randomness or an imported phrase.
@@ -117,17 +115,13 @@ class Seed(object):
         raise ValueError("Invalid checksum")
 
     def sc_reduce(self, input):
-        integer = ed25519.decodeint(input)
-        modulo = integer % ed25519.l
-        return hexlify(ed25519.encodeint(modulo)).decode()
+        return hexlify(provider.get_provider().sc_reduce32(input)).decode()
 
     def hex_seed(self):
         return self.hex
 
     def _hex_seed_keccak(self):
-        h = keccak_256()
-        h.update(unhexlify(self.hex))
-        return h.digest()
+        return provider.get_provider().keccak_256(unhexlify(self.hex))
 
     def secret_spend_key(self):
         a = self._hex_seed_keccak() if self.is_myuplexa() else unhexlify(self.hex)
@@ -135,20 +129,20 @@ class Seed(object):
 
     def secret_view_key(self):
         b = self._hex_seed_keccak() if self.is_myuplexa() else unhexlify(self.secret_spend_key())
-        h = keccak_256()
-        h.update(b)
-        return self.sc_reduce(h.digest())
+        return self.sc_reduce(provider.get_provider().keccak_256(b))
 
     def public_spend_key(self):
         if self._ed_pub_spend_key:
             return self._ed_pub_spend_key
-        self._ed_pub_spend_key = ed25519.public_from_secret_hex(self.secret_spend_key())
+        self._ed_pub_spend_key = hexlify(provider.get_provider().public_from_secret(
+                unhexlify(self.secret_spend_key()))).decode()
         return self._ed_pub_spend_key
 
     def public_view_key(self):
         if self._ed_pub_view_key:
             return self._ed_pub_view_key
-        self._ed_pub_view_key = ed25519.public_from_secret_hex(self.secret_view_key())
+        self._ed_pub_view_key = hexlify(provider.get_provider().public_from_secret(
+                unhexlify(self.secret_view_key()))).decode()
         return self._ed_pub_view_key
 
     def public_address(self, net='mainnet'):
@@ -158,15 +152,7 @@ class Seed(object):
 
         :rtype: :class:`Address <uplexa.address.Address>`
         """
-        if net not in ('mainnet', 'testnet', 'stagenet'):
-            raise ValueError(
-                "Invalid net argument. Must be one of ('mainnet', 'testnet', 'stagenet').")
-        netbyte = 18 if net == 'mainnet' else 53 if net == 'testnet' else 24
-        data = "{:x}{:s}{:s}".format(netbyte, self.public_spend_key(), self.public_view_key())
-        h = keccak_256()
-        h.update(unhexlify(data))
-        checksum = h.hexdigest()
-        return address(base58.encode(data + checksum[0:8]))
+        return Address.from_keys(net, self.public_spend_key(), self.public_view_key())
 
 
 def generate_hex(n_bytes=32):
@@ -179,6 +179,7 @@ class PaymentFilter(object):
                 except TypeError:
                     local_addresses = [_local_address]
             self.local_addresses = list(map(address, local_addresses))
+        self._local_addresses = frozenset(self.local_addresses)
         if _payment_id is None:
             self.payment_ids = []
         else:
@@ -209,7 +210,7 @@ class PaymentFilter(object):
                 return False
         if self.payment_ids and payment.payment_id not in self.payment_ids:
             return False
-        if self.local_addresses and payment.local_address not in self.local_addresses:
+        if self.local_addresses and payment.local_address not in self._local_addresses:
             return False
         return True
 
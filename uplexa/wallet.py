@@ -1,11 +1,14 @@
-from binascii import hexlify, unhexlify
+from binascii import unhexlify
+import collections
 from sha3 import keccak_256
+import multiprocessing
 import struct
 
 from . import address
 from . import base58
-from . import ed25519
+from . import parallel
 from . import prio
+from . import provider
 from .transaction import Payment, PaymentManager
 
 
@@ -24,11 +27,16 @@ class Wallet(object):
     The wallet exposes a number of methods that operate on the default account (of index 0).
 
     :param backend: a wallet backend
+    :param index: a :class:`SubaddressIndex <uplexa.index.SubaddressIndex>` to be extended
+                with every address derived by :meth:`get_address` and similar methods
     """
     accounts = None
+    index = None
+    _keys = None
 
-    def __init__(self, backend):
+    def __init__(self, backend, index=None):
         self._backend = backend
+        self.index = index
         self.incoming = PaymentManager(0, backend, 'in')
         self.outgoing = PaymentManager(0, backend, 'out')
         self.refresh()
@@ -39,7 +47,10 @@ class Wallet(object):
         on :class:`Wallet` initialization. When the wallet is accessed by multiple clients or
         exists in multiple instances, calling `refresh()` will be necessary to update
         the list of accounts.
+
+        It also drops the :meth:`key snapshot <key_snapshot>`, which is reloaded on next use.
         """
+        self._keys = None
         self.accounts = self.accounts or []
         idx = 0
         for _acc in self._backend.accounts():
@@ -79,6 +90,21 @@ class Wallet(object):
         """
         return self._backend.view_key()
 
+    def key_snapshot(self):
+        """
+        Returns the key material used for local derivations, as :class:`KeySnapshot`.
+        It's loaded from the backend on first call and kept until :meth:`refresh`,
+        so deriving addresses doesn't query the backend.
+
+        :rtype: :class:`KeySnapshot`
+        """
+        if self._keys is None:
+            keys = KeySnapshot(self.address(), self.view_key())
+            if self.index is not None:
+                self.index.attach(keys.address)
+            self._keys = keys
+        return self._keys
+
     def seed(self):
         """
         Returns word seed.
@@ -199,33 +225,65 @@ class Wallet(object):
 
         :rtype: :class:`BaseAddress <uplexa.address.BaseAddress>`
         """
+        return next(self.iter_addresses(major, (minor,)))
+
+    def get_addresses(self, major, minors, processes=1):
+        """
+        Calculates sub-addresses for account index (`major`) and a sequence of address
+        indexes within the account (`minors`), e.g. a `range`.
+        See :meth:`iter_addresses` for `processes`.
+
+        :rtype: list of :class:`BaseAddress <uplexa.address.BaseAddress>`
+        """
+        return list(self.iter_addresses(major, minors, processes=processes))
+
+    def iter_addresses(self, major, minors, chunk_size=1024, processes=1):
+        """
+        Iterates over sub-addresses for account index (`major`) and a sequence of address
+        indexes within the account (`minors`), which may be very long or unbounded.
+
+        The master keys and the hashing prefix are prepared once, and the addresses are
+        derived in chunks of `chunk_size`, encoding each chunk with a single field inversion.
+        If the wallet has an :attr:`index`, each chunk is stored in it.
+
+        With `processes` other than `1` the chunks are derived across a pool of worker
+        processes (`None` meaning the number of CPUs) and yielded in order. The workers
+        receive only the public spend key and the private view key.
+
+        :rtype: iterator of :class:`BaseAddress <uplexa.address.BaseAddress>`
+        """
         # ensure indexes are within uint32
         if major < 0 or major >= 2**32:
             raise ValueError('major index {} is outside uint32 range'.format(major))
-        if minor < 0 or minor >= 2**32:
-            raise ValueError('minor index {} is outside uint32 range'.format(minor))
-        master_address = self.address()
-        if major == minor == 0:
-            return master_address
-        master_svk = unhexlify(self.view_key())
-        master_psk = unhexlify(self.address().spend_key())
-        # m = Hs("SubAddr\0" || master_svk || major || minor)
-        hsdata = b''.join([
-                b'SubAddr\0', master_svk,
-                struct.pack('<I', major), struct.pack('<I', minor)])
-        m = keccak_256(hsdata).digest()
-        # D = master_psk + m * B
-        D = ed25519.add_compressed(
-                ed25519.decodepoint(master_psk),
-                ed25519.scalarmult(ed25519.B, ed25519.decodeint(m)))
-        # C = master_svk * D
-        C = ed25519.scalarmult(D, ed25519.decodeint(master_svk))
-        netbyte = bytearray([
-                42 if master_address.is_mainnet() else \
-                63 if master_address.is_testnet() else 36])
-        data = netbyte + ed25519.encodepoint(D) + ed25519.encodepoint(C)
-        checksum = keccak_256(data).digest()[:4]
-        return address.SubAddress(base58.encode(hexlify(data + checksum)))
+        keys = self.key_snapshot()
+
+        def checked(chunks):
+            for chunk in chunks:
+                for minor in chunk:
+                    if minor < 0 or minor >= 2**32:
+                        raise ValueError('minor index {} is outside uint32 range'.format(minor))
+                yield chunk
+
+        chunks = checked(parallel.chunks(minors, chunk_size))
+        if processes == 1:
+            p = provider.get_provider()
+            results = (keys.derive(p, major, chunk) for chunk in chunks)
+        else:
+            results = _derive_in_pool(keys, major, chunks, processes)
+        for chunk, pubs in results:
+            entries = []
+            for minor, (spend_key, data) in zip(chunk, pubs):
+                if major == minor == 0:
+                    entries.append((keys.spend_key, keys.address_bytes, major, minor))
+                else:
+                    entries.append((spend_key, data, major, minor))
+            if self.index is not None:
+                self.index.add(entries)
+            for spend_key, data, _, minor in entries:
+                if major == minor == 0:
+                    yield keys.address
+                else:
+                    yield address.SubAddress._from_bytes(data)
 
     def transfer(self, address, amount,
             priority=prio.NORMAL, payment_id=None, unlock_time=0,
@@ -281,3 +339,104 @@ class Wallet(object):
                 payment_id=payment_id,
                 unlock_time=unlock_time,
                 relay=relay)
+
+
+class KeySnapshot(object):
+    """
+    Key material of a wallet, used for local derivations.
+
+    This class is not intended to be turned into objects by the user,
+    it is returned by :meth:`Wallet.key_snapshot`.
+
+    :param address: the master :class:`Address <uplexa.address.Address>`
+    :param view_key: the private view key, as hexadecimal string
+    """
+    def __init__(self, address, view_key):
+        self.address = address
+        self.address_bytes = base58.decode_bytes(str(address))
+        self.spend_key = self.address_bytes[1:33]
+        self.view_key = unhexlify(view_key)
+        self.subaddress_netbyte = \
+                42 if address.is_mainnet() else 63 if address.is_testnet() else 36
+        self._bases = {}
+
+    def __getstate__(self):
+        # the bases refer to provider objects, and are computed again on demand
+        state = dict(self.__dict__)
+        state['_bases'] = {}
+        return state
+
+    def subaddress_bases(self, p):
+        """
+        Returns the master public spend key point, its product with the private view key and
+        the fixed-base form of the public view key, for provider `p`. These are computed once
+        per provider, so deriving a subaddress takes only two fixed-base multiplications.
+        """
+        try:
+            return self._bases[p]
+        except KeyError:
+            pass
+        self._bases[p] = _subaddress_bases(p, self.spend_key, self.view_key)
+        return self._bases[p]
+
+    def derive(self, p, major, minors):
+        """
+        Derives subaddresses of account `major` for the list of `minors` with provider `p`.
+        Returns the pair of `minors` and a list of `(spend_key, address_bytes)` tuples.
+        The index `(0, 0)` is not treated specially and gives no valid address.
+        """
+        return minors, _derive(
+            p, self.subaddress_bases(p), self.subaddress_netbyte, self.view_key, major, minors)
+
+
+def _subaddress_bases(p, spend_key, view_key):
+    P = p.decodepoint(spend_key)
+    A = p.fixed_base(p.scalarmult_base(view_key))
+    return (P, p.scalarmult(P, view_key), A)
+
+def _derive(p, bases, netbyte, view_key, major, minors):
+    P, aP, A = bases
+    # m = Hs("SubAddr\0" || master_svk || major || minor)
+    prefix = b''.join([b'SubAddr\0', view_key, struct.pack('<I', major)])
+    ms = [p.sc_reduce32(p.keccak_256(prefix + struct.pack('<I', minor))) for minor in minors]
+    # D = master_psk + m * B
+    Ds = [p.point_add(P, mB) for mB in p.batch_scalarmult_base(ms)]
+    # C = master_svk * D = master_svk * master_psk + m * (master_svk * B)
+    Cs = [p.point_add(aP, mA) for mA in p.batch_scalarmult(A, ms)]
+    pubs = p.batch_encodepoint(Ds + Cs)
+    res = []
+    for i in range(len(minors)):
+        data = bytearray([netbyte]) + pubs[i] + pubs[len(minors) + i]
+        res.append((pubs[i], bytes(data + keccak_256(data).digest()[:4])))
+    return res
+
+def _derive_in_pool(keys, major, chunks, processes):
+    # at most two chunks per worker are in flight, so unbounded sequences are fine
+    processes = processes or multiprocessing.cpu_count()
+    task = (keys.spend_key, keys.view_key, keys.subaddress_netbyte, major)
+    with parallel.process_pool(processes) as pool:
+        pending = collections.deque()
+        try:
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(_derive_in_worker, task, chunk)))
+                if len(pending) >= 2 * processes:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        finally:
+            for chunk, future in pending:
+                future.cancel()
+
+
+_worker_bases = None
+
+def _derive_in_worker(task, minors):
+    # the bases are kept between tasks, as a worker usually gets the keys of one wallet
+    global _worker_bases
+    spend_key, view_key, netbyte, major = task
+    p = provider.get_provider()
+    if _worker_bases is None or _worker_bases[0] != (p, spend_key, view_key):
+        _worker_bases = ((p, spend_key, view_key), _subaddress_bases(p, spend_key, view_key))
+    return _derive(p, _worker_bases[1], netbyte, view_key, major, minors)
@@ -0,0 +1,83 @@
+#!/usr/bin/python
+import argparse
+import contextlib
+import csv
+import json
+import logging
+import re
+import sys
+import time
+
+from uplexa.backends.offline import OfflineWallet
+from uplexa.wallet import Wallet
+
+def index_range(value):
+    m = re.match(r'^(?P<start>[0-9]+)(?:-(?P<stop>[0-9]+))?$', value)
+    if not m:
+        raise argparse.ArgumentTypeError("Invalid range {0}, use N or N-M".format(value))
+    start = int(m.group('start'))
+    stop = int(m.group('stop') or start)
+    if stop < start:
+        raise argparse.ArgumentTypeError("Empty range {0}".format(value))
+    return range(start, stop + 1)
+
+argsparser = argparse.ArgumentParser(
+    description="Derive subaddresses of a wallet and write them as JSON lines or CSV")
+argsparser.add_argument('address', help="Master address of the wallet")
+argsparser.add_argument('view_key', help="Private view key of the wallet")
+argsparser.add_argument('-a', '--accounts', dest='majors', type=index_range, default='0',
+    help="Account indexes, N or N-M (inclusive) [0]")
+argsparser.add_argument('-i', '--indexes', dest='minors', type=index_range, default='0-999',
+    help="Address indexes within each account, N or N-M (inclusive) [0-999]")
+argsparser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default='jsonl',
+    help="Output format [jsonl]")
+argsparser.add_argument('-o', '--output', type=argparse.FileType('w'), default=sys.stdout,
+    help="Output file [stdout]")
+argsparser.add_argument('-p', '--processes', type=int, default=1,
+    help="Number of worker processes, 0 for the number of CPUs [1]")
+argsparser.add_argument('-c', '--chunk-size', dest='chunk_size', type=int, default=1024,
+    help="Number of addresses derived at once [1024]")
+argsparser.add_argument('-q', '--quiet', action='store_true',
+    help="Don't report progress on stderr")
+argsparser.add_argument('-v', dest='verbosity', action='count', default=0,
+    help="Verbosity (repeat to increase; -v for INFO, -vv for DEBUG")
+args = argsparser.parse_args()
+level = logging.WARNING
+if args.verbosity == 1:
+    level = logging.INFO
+elif args.verbosity > 1:
+    level = logging.DEBUG
+logging.basicConfig(level=level, format="%(asctime)-15s %(message)s")
+
+w = Wallet(OfflineWallet(args.address, view_key=args.view_key))
+if not w.address().check_private_view_key(args.view_key):
+    print("View key doesn't match the address", file=sys.stderr)
+    sys.exit(-1)
+
+if args.format == 'csv':
+    writer = csv.writer(args.output)
+    writer.writerow(('major', 'minor', 'address'))
+    write = lambda major, minor, addr: writer.writerow((major, minor, addr))
+else:
+    write = lambda major, minor, addr: args.output.write(
+        json.dumps({'major': major, 'minor': minor, 'address': str(addr)}) + "\n")
+
+total = len(args.majors) * len(args.minors)
+done = 0
+started = time.time()
+for major in args.majors:
+    addrs = w.iter_addresses(
+        major, args.minors, chunk_size=args.chunk_size, processes=args.processes or None)
+    with contextlib.closing(addrs):
+        for minor, addr in zip(args.minors, addrs):
+            write(major, minor, addr)
+            done += 1
+            if not args.quiet and (done % args.chunk_size == 0 or done == total):
+                elapsed = time.time() - started
+                print("\r{done}/{total} addresses, {rate:.0f}/s".format(
+                        done=done, total=total, rate=done / elapsed if elapsed else 0),
+                    end='', file=sys.stderr)
+                sys.stderr.flush()
+if not args.quiet:
+    print(file=sys.stderr)
+args.output.flush()